@@ -442,7 +442,7 @@ class APISecurity:
         """Store encrypted audit log securely"""
         try:
             # Store in HSM-based audit storage
-            self.hsm._store_key_in_hsm(encrypted_audit)
+            self.hsm.store_audit_record(encrypted_audit)
         except Exception as e:
             self.logger.error(f"Audit storage failed: {str(e)}")
             raise APIError(f"Failed to store audit log: {str(e)}")
@@ -0,0 +1,127 @@
+"""
+Background Audit Flushing
+
+This module runs the one background thread per process that writes out
+pending audit records for the security components that buffer them.
+"""
+
+from typing import Any, List, Optional, Tuple
+import atexit
+import heapq
+import itertools
+import logging
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Longest the shared flusher sleeps before rechecking its schedule
+FLUSHER_MAX_SLEEP_SECONDS = 60
+
+class AuditFlusher:
+    """
+    Single daemon thread that flushes buffered audit records for every owner.
+    
+    Owners provide flush_audit_log() and are held weakly, scheduled on a heap
+    by their next flush time. The thread sleeps on an event so registrations
+    and flush requests wake it early, and it exits once no owners remain. One
+    exit hook flushes every owner still registered at shutdown.
+    """
+    
+    def __init__(self):
+        self._schedule: List[Tuple[float, int, weakref.ref]] = []
+        self._due: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+        self._intervals: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self._flush_all)
+    
+    def register(self, owner: Any, interval: float) -> None:
+        """Flush an owner's audit records every interval seconds"""
+        with self._lock:
+            self._intervals[owner] = interval
+        self._schedule_flush(owner, interval)
+    
+    def unregister(self, owner: Any) -> None:
+        """Stop flushing an owner's audit records"""
+        with self._lock:
+            self._due.pop(owner, None)
+            self._intervals.pop(owner, None)
+        self._wakeup.set()
+    
+    def request_flush(self, owner: Any) -> None:
+        """Flush a registered owner's audit records as soon as possible"""
+        with self._lock:
+            due = self._due.get(owner)
+            if due is None or due <= time.monotonic():
+                return  # Unregistered, or a flush is already due
+        self._schedule_flush(owner, 0)
+    
+    def _schedule_flush(self, owner: Any, delay: float) -> None:
+        """Set an owner's next flush time, superseding any earlier entry"""
+        with self._lock:
+            due = time.monotonic() + delay
+            self._due[owner] = due
+            heapq.heappush(self._schedule, (due, next(self._sequence), weakref.ref(owner)))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+    
+    def _run(self) -> None:
+        """Run due flushes in schedule order"""
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                # Drop entries for collected, unregistered or rescheduled owners
+                owner = None
+                while self._schedule:
+                    owner = self._schedule[0][2]()
+                    if owner is not None and self._due.get(owner) == self._schedule[0][0]:
+                        break
+                    heapq.heappop(self._schedule)
+                del owner
+                
+                if not self._schedule:
+                    self._thread = None
+                    return
+                
+                wait = self._schedule[0][0] - time.monotonic()
+                if wait <= 0:
+                    ref = heapq.heappop(self._schedule)[2]
+            
+            if wait > 0:
+                self._wakeup.wait(min(wait, FLUSHER_MAX_SLEEP_SECONDS))
+                continue
+            
+            owner = ref()
+            if owner is None:
+                continue  # Owner was garbage collected
+            
+            try:
+                owner.flush_audit_log()
+            except Exception as e:
+                logger.error(f"Background audit flush failed: {str(e)}")
+            
+            with self._lock:
+                interval = self._intervals.get(owner)
+                if interval is not None:
+                    due = time.monotonic() + interval
+                    self._due[owner] = due
+                    heapq.heappush(self._schedule, (due, next(self._sequence), ref))
+            del owner
+    
+    def _flush_all(self) -> None:
+        """Write out every registered owner's pending audit records at shutdown"""
+        with self._lock:
+            owners = list(self._intervals.keys())
+        for owner in owners:
+            try:
+                owner.flush_audit_log()
+            except Exception as e:
+                logger.error(f"Audit flush at exit failed: {str(e)}")
+
+audit_flusher = AuditFlusher()
@@ -9,6 +9,16 @@ import logging
 import re
 from cryptography.fernet import Fernet
 
+# Masked-output templates, built once at import time
+CC_PARTIAL_PREFIX = "****-****-****-"
+SSN_PARTIAL_PREFIX = "***-**-"
+PHONE_PARTIAL_PREFIX = "***-***-"
+CC_FULL_MASK = "XXXXXXXXXXXXXXXX"
+SSN_FULL_MASK = "XXX-XX-XXXX"
+PHONE_FULL_MASK = "XXX-XXX-XXXX"
+EMAIL_FULL_MASK = "user@domain.com"
+GENERIC_FULL_MASK = "XXXXX"
+
 class MaskingError(Exception):
     """Raised when masking fails"""
     pass
@@ -23,16 +33,48 @@ class DataMasker:
         
         if self.masking_type not in ["partial", "full", "hash"]:
             raise MaskingError("Invalid masking type. Must be 'partial', 'full', or 'hash'")
+        
+        # Resolve the masking strategy once so the per-call path has no branching
+        strategies = {
+            "partial": {
+                "credit_card": lambda v: self._partial(CC_PARTIAL_PREFIX, v, 4),
+                "ssn": lambda v: self._partial(SSN_PARTIAL_PREFIX, v, 4),
+                "phone": lambda v: self._partial(PHONE_PARTIAL_PREFIX, v, 4),
+                "email": self._partial_email,
+                "generic": lambda v: v[0] + "***" + v[-1],
+            },
+            "full": {
+                "credit_card": lambda v: CC_FULL_MASK,
+                "ssn": lambda v: SSN_FULL_MASK,
+                "phone": lambda v: PHONE_FULL_MASK,
+                "email": lambda v: EMAIL_FULL_MASK,
+                "generic": lambda v: GENERIC_FULL_MASK,
+            },
+            "hash": dict.fromkeys(
+                ("credit_card", "ssn", "phone", "email", "generic"), self._hash_value
+            ),
+        }[self.masking_type]
+        self._mask_credit_card = strategies["credit_card"]
+        self._mask_ssn = strategies["ssn"]
+        self._mask_phone = strategies["phone"]
+        self._mask_email = strategies["email"]
+        self._mask_generic = strategies["generic"]
+    
+    @staticmethod
+    def _partial(prefix: str, value: str, keep: int) -> str:
+        """Keep the last ``keep`` characters of a value behind a fixed prefix"""
+        return prefix + value[-keep:]
+    
+    @staticmethod
+    def _partial_email(email: str) -> str:
+        """Keep the first username character and the domain of an email"""
+        username, domain = email.split('@')[:2]
+        return username[0] + "***@" + domain
     
     def mask_credit_card(self, card_number: str) -> str:
         """Mask credit card number"""
         try:
-            if self.masking_type == "partial":
-                return f"****-****-****-{card_number[-4:]}"
-            elif self.masking_type == "full":
-                return "XXXXXXXXXXXXXXXX"
-            elif self.masking_type == "hash":
-                return self._hash_value(card_number)
+            return self._mask_credit_card(card_number)
         except Exception as e:
             self.logger.error(f"Credit card masking failed: {str(e)}")
             raise MaskingError(f"Failed to mask credit card: {str(e)}")
@@ -40,12 +82,7 @@ class DataMasker:
     def mask_ssn(self, ssn: str) -> str:
         """Mask SSN"""
         try:
-            if self.masking_type == "partial":
-                return f"***-**-{ssn[-4:]}"
-            elif self.masking_type == "full":
-                return "XXX-XX-XXXX"
-            elif self.masking_type == "hash":
-                return self._hash_value(ssn)
+            return self._mask_ssn(ssn)
         except Exception as e:
             self.logger.error(f"SSN masking failed: {str(e)}")
             raise MaskingError(f"Failed to mask SSN: {str(e)}")
@@ -53,12 +90,7 @@ class DataMasker:
     def mask_phone(self, phone: str) -> str:
         """Mask phone number"""
         try:
-            if self.masking_type == "partial":
-                return f"***-***-{phone[-4:]}"
-            elif self.masking_type == "full":
-                return "XXX-XXX-XXXX"
-            elif self.masking_type == "hash":
-                return self._hash_value(phone)
+            return self._mask_phone(phone)
         except Exception as e:
             self.logger.error(f"Phone masking failed: {str(e)}")
             raise MaskingError(f"Failed to mask phone: {str(e)}")
@@ -66,15 +98,7 @@ class DataMasker:
     def mask_email(self, email: str) -> str:
         """Mask email address"""
         try:
-            if self.masking_type == "partial":
-                parts = email.split('@')
-                username = parts[0]
-                domain = parts[1]
-                return f"{username[0]}***@{domain}"
-            elif self.masking_type == "full":
-                return "user@domain.com"
-            elif self.masking_type == "hash":
-                return self._hash_value(email)
+            return self._mask_email(email)
         except Exception as e:
             self.logger.error(f"Email masking failed: {str(e)}")
             raise MaskingError(f"Failed to mask email: {str(e)}")
@@ -97,12 +121,7 @@ class DataMasker:
                         elif re.match(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", value):
                             masked_data[field] = self.mask_email(value)
                         else:
-                            if self.masking_type == "partial":
-                                masked_data[field] = f"{value[0]}***{value[-1]}"
-                            elif self.masking_type == "full":
-                                masked_data[field] = "XXXXX"
-                            elif self.masking_type == "hash":
-                                masked_data[field] = self._hash_value(value)
+                            masked_data[field] = self._mask_generic(value)
             
             return masked_data
         except Exception as e:
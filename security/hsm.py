@@ -5,23 +5,80 @@ This module implements enterprise-grade key management and cryptographic operati
 following NIST SP 800-57 and FIPS 140-2 standards.
 """
 
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, BinaryIO
 import logging
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, ec
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.asymmetric import padding, utils
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import base64
+import collections
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import heapq
+import itertools
 import os
+import secrets
+import threading
 import datetime
 import time
 
+# Merkle batch signing parameters
+MERKLE_DIGEST_SIZE = 32
+MERKLE_LEAF_PREFIX = b"\x00"
+MERKLE_NODE_PREFIX = b"\x01"
+
+# Chunk size used when hashing streamed sign/verify inputs
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Default number of successful verifications remembered by HSM.verify
+DEFAULT_VERIFY_CACHE_SIZE = 16384
+
 class HSMError(Exception):
     """Raised when HSM operations fail"""
     pass
 
+class _RandPool:
+    """
+    Buffered kernel CSPRNG output, refilled with one syscall per block.
+    
+    Only for public values such as nonces and IVs; the buffer outlives the
+    bytes it hands out, so secret key material must not come from here.
+    """
+    
+    def __init__(self, block_size: int = 4096):
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Discard buffered bytes so they are never shared (e.g. across fork)"""
+        self._buffer = b""
+        self._offset = 0
+    
+    def take(self, n: int) -> bytes:
+        """Return n random bytes, each handed out exactly once"""
+        if n > self._block_size:
+            return os.urandom(n)
+        with self._lock:
+            if self._offset + n > len(self._buffer):
+                self._buffer = os.urandom(self._block_size)
+                self._offset = 0
+            start = self._offset
+            self._offset = start + n
+            return self._buffer[start:start + n]
+
+_rand = _RandPool()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_rand._reset)
+
+@functools.lru_cache(maxsize=256)
+def _load_pem(pem: bytes) -> Any:
+    """Parse a PEM public key, caching recently used recipients"""
+    return serialization.load_pem_public_key(pem)
+
 class HSM:
     """
     Enterprise-grade Hardware Security Module.
@@ -29,6 +86,9 @@ class HSM:
     Implements NIST SP 800-57 and FIPS 140-2 cryptographic standards.
     """
     
+    # Simulated HSM decryption key, generated lazily on first use
+    _DUMMY_KEY: Optional[rsa.RSAPrivateKey] = None
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize HSM with configuration.
@@ -39,6 +99,8 @@ class HSM:
                 - key_storage: Key storage location (must be HSM)
                 - key_sizes: Dictionary of key sizes for different algorithms
                 - crypto_algorithms: Supported cryptographic algorithms
+                - verify_cache_size: Number of verified signatures to cache
+                - max_workers: Worker threads for bulk sign/verify
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
@@ -62,9 +124,44 @@ class HSM:
         # Key management
         self.active_keys: Dict[str, Dict[str, Any]] = {}
         self.key_rotation_interval = datetime.timedelta(days=self.key_rotation_days)
+        self._key_rotation_interval_ns = int(self.key_rotation_interval.total_seconds()) * 1_000_000_000
+        
+        # Min-heap of (created_ns, key_id) so rotation only visits expired keys
+        self._expiry_heap: List[Tuple[int, str]] = []
+        
+        # Hash and padding parameters shared by every sign/verify/encrypt call
+        self._sha384 = hashes.SHA384()
+        self._pss = padding.PSS(
+            mgf=padding.MGF1(self._sha384),
+            salt_length=padding.PSS.MAX_LENGTH
+        )
+        self._ecdsa_sha384 = ec.ECDSA(self._sha384)
+        self._prehashed_sha384 = utils.Prehashed(self._sha384)
+        self._ecdsa_prehashed_sha384 = ec.ECDSA(self._prehashed_sha384)
+        self._sha256 = hashes.SHA256()
+        self._oaep = padding.OAEP(
+            mgf=padding.MGF1(algorithm=self._sha256),
+            algorithm=self._sha256,
+            label=None
+        )
+        
+        # LRU cache of successful verifications keyed by (key_id, digest, signature)
+        self.verify_cache_size = config.get("verify_cache_size", DEFAULT_VERIFY_CACHE_SIZE)
+        self._verify_cache: collections.OrderedDict = collections.OrderedDict()
+        self._verify_cache_lock = threading.Lock()
         
         if self.key_storage != "HSM":
             raise HSMError("Key storage must be HSM for enterprise security")
+        
+        # Worker pool for bulk operations; OpenSSL releases the GIL during RSA/EC math
+        self._exec = ThreadPoolExecutor(
+            max_workers=config.get("max_workers", os.cpu_count()),
+            thread_name_prefix="hsm"
+        )
+    
+    def close(self) -> None:
+        """Shut down the bulk operation worker pool"""
+        self._exec.shutdown(wait=True)
     
     def generate_key_pair(self, algorithm: str = "RSA") -> Dict[str, Any]:
         """
@@ -104,7 +201,7 @@ class HSM:
                 "key_id": key_id,
                 "algorithm": algorithm,
                 "key_size": key_size,
-                "created_at": datetime.datetime.now().isoformat()
+                "created_at": self._monotonic_ns_to_iso(self.active_keys[key_id]["created_ns"])
             }
             
         except Exception as e:
@@ -130,19 +227,9 @@ class HSM:
             key = self._get_key_from_hsm(key_id)
             
             if algorithm.upper() == "RSA-PSS":
-                signature = key.sign(
-                    data,
-                    padding.PSS(
-                        mgf=padding.MGF1(hashes.SHA384()),
-                        salt_length=padding.PSS.MAX_LENGTH
-                    ),
-                    hashes.SHA384()
-                )
+                signature = key.sign(data, self._pss, self._sha384)
             elif algorithm.upper() == "ECDSA":
-                signature = key.sign(
-                    data,
-                    ec.ECDSA(hashes.SHA384())
-                )
+                signature = key.sign(data, self._ecdsa_sha384)
             else:
                 raise HSMError(f"Unsupported signing algorithm: {algorithm}")
             
@@ -169,33 +256,284 @@ class HSM:
             HSMError: If verification fails
         """
         try:
-            key = self._get_key_from_hsm(key_id)
+            cache_key = (key_id, algorithm.upper(), hashlib.sha384(data).digest(), signature)
+            with self._verify_cache_lock:
+                if cache_key in self._verify_cache:
+                    self._verify_cache.move_to_end(cache_key)
+                    return True
+            
+            key = self._get_key_from_hsm(key_id).public_key()
             
             if algorithm.upper() == "RSA-PSS":
-                key.verify(
-                    signature,
-                    data,
-                    padding.PSS(
-                        mgf=padding.MGF1(hashes.SHA384()),
-                        salt_length=padding.PSS.MAX_LENGTH
-                    ),
-                    hashes.SHA384()
-                )
+                key.verify(signature, data, self._pss, self._sha384)
             elif algorithm.upper() == "ECDSA":
-                key.verify(
-                    signature,
-                    data,
-                    ec.ECDSA(hashes.SHA384())
-                )
+                key.verify(signature, data, self._ecdsa_sha384)
             else:
                 raise HSMError(f"Unsupported verification algorithm: {algorithm}")
             
+            # Only successful verifications are cached; failures raise above.
+            # Skip caching if the key was rotated out while verifying
+            with self._verify_cache_lock:
+                if key_id in self.active_keys:
+                    self._verify_cache[cache_key] = True
+                    if len(self._verify_cache) > self.verify_cache_size:
+                        self._verify_cache.popitem(last=False)
+            
             return True
             
         except Exception as e:
             self.logger.error(f"HSM verification failed: {str(e)}")
             raise HSMError(f"Failed to verify signature: {str(e)}")
     
+    def sign_many(self, key_id: str, data_list: List[bytes], algorithm: str = "RSA-PSS") -> List[bytes]:
+        """
+        Sign many data items in parallel using HSM-stored key.
+        
+        Args:
+            key_id: Identifier of the signing key
+            data_list: Data items to sign
+            algorithm: Signing algorithm (RSA-PSS or ECDSA)
+            
+        Returns:
+            Signatures in the same order as data_list
+            
+        Raises:
+            HSMError: If any signing fails
+        """
+        return list(self._exec.map(lambda data: self.sign(key_id, data, algorithm), data_list))
+    
+    def verify_many(self, key_id: str, data_list: List[bytes], signatures: List[bytes],
+                    algorithm: str = "RSA-PSS") -> bool:
+        """
+        Verify many signatures in parallel using HSM-stored key.
+        
+        Args:
+            key_id: Identifier of the verification key
+            data_list: Data items to verify
+            signatures: Signatures matching the data items
+            algorithm: Verification algorithm (RSA-PSS or ECDSA)
+            
+        Returns:
+            True if all signatures are valid
+            
+        Raises:
+            HSMError: If any verification fails
+        """
+        if len(data_list) != len(signatures):
+            raise HSMError("Number of items and signatures must match")
+        
+        return all(self._exec.map(
+            lambda pair: self.verify(key_id, pair[0], pair[1], algorithm),
+            zip(data_list, signatures)
+        ))
+    
+    def sign_stream(self, key_id: str, reader: BinaryIO, algorithm: str = "RSA-PSS") -> bytes:
+        """
+        Sign a binary stream without materializing it in memory.
+        
+        The stream is hashed in fixed-size chunks and the SHA-384 digest is
+        signed as a prehashed value, so the signature matches sign() over
+        the same bytes.
+        
+        Args:
+            key_id: Identifier of the signing key
+            reader: Binary stream supporting readinto()
+            algorithm: Signing algorithm (RSA-PSS or ECDSA)
+            
+        Returns:
+            Signature bytes
+            
+        Raises:
+            HSMError: If signing fails
+        """
+        try:
+            key = self._get_key_from_hsm(key_id)
+            digest = self._digest_stream(reader)
+            
+            if algorithm.upper() == "RSA-PSS":
+                return key.sign(digest, self._pss, self._prehashed_sha384)
+            elif algorithm.upper() == "ECDSA":
+                return key.sign(digest, self._ecdsa_prehashed_sha384)
+            raise HSMError(f"Unsupported signing algorithm: {algorithm}")
+            
+        except Exception as e:
+            self.logger.error(f"HSM stream signing failed: {str(e)}")
+            raise HSMError(f"Failed to sign stream: {str(e)}")
+    
+    def verify_stream(self, key_id: str, reader: BinaryIO, signature: bytes,
+                      algorithm: str = "RSA-PSS") -> bool:
+        """
+        Verify a signature over a binary stream without materializing it.
+        
+        Args:
+            key_id: Identifier of the verification key
+            reader: Binary stream supporting readinto()
+            signature: Signature to verify
+            algorithm: Verification algorithm (RSA-PSS or ECDSA)
+            
+        Returns:
+            True if signature is valid
+            
+        Raises:
+            HSMError: If verification fails
+        """
+        try:
+            key = self._get_key_from_hsm(key_id).public_key()
+            digest = self._digest_stream(reader)
+            
+            if algorithm.upper() == "RSA-PSS":
+                key.verify(signature, digest, self._pss, self._prehashed_sha384)
+            elif algorithm.upper() == "ECDSA":
+                key.verify(signature, digest, self._ecdsa_prehashed_sha384)
+            else:
+                raise HSMError(f"Unsupported verification algorithm: {algorithm}")
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"HSM stream verification failed: {str(e)}")
+            raise HSMError(f"Failed to verify stream signature: {str(e)}")
+    
+    def _digest_stream(self, reader: BinaryIO) -> bytes:
+        """Hash a stream with SHA-384 through a single reusable chunk buffer"""
+        hasher = hashes.Hash(self._sha384)
+        buffer = bytearray(STREAM_CHUNK_SIZE)
+        view = memoryview(buffer)
+        
+        while True:
+            read = reader.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+        
+        return hasher.finalize()
+    
+    def sign_batch(self, key_id: str, items: List[bytes], algorithm: str = "RSA-PSS") -> List[bytes]:
+        """
+        Sign a batch of items with a single signature over their Merkle root.
+        
+        Args:
+            key_id: Identifier of the signing key
+            items: Data items to sign
+            algorithm: Signing algorithm (RSA-PSS or ECDSA)
+            
+        Returns:
+            Per-item batch signatures, each encoded as
+            leaf index (4 bytes) + proof depth (1 byte) + sibling hashes + root signature
+            
+        Raises:
+            HSMError: If signing fails
+        """
+        if not items:
+            return []
+        
+        try:
+            levels = self._merkle_levels([self._merkle_leaf(item) for item in items])
+            root_signature = self.sign(key_id, levels[-1][0], algorithm)
+            
+            batch_signatures = []
+            for index in range(len(items)):
+                proof = []
+                position = index
+                for level in levels[:-1]:
+                    proof.append(level[position ^ 1])
+                    position >>= 1
+                batch_signatures.append(
+                    index.to_bytes(4, "big")
+                    + len(proof).to_bytes(1, "big")
+                    + b"".join(proof)
+                    + root_signature
+                )
+            
+            return batch_signatures
+            
+        except Exception as e:
+            self.logger.error(f"HSM batch signing failed: {str(e)}")
+            raise HSMError(f"Failed to sign batch: {str(e)}")
+    
+    def verify_batch(self, key_id: str, items: List[bytes], signatures: List[bytes],
+                     algorithm: str = "RSA-PSS") -> bool:
+        """
+        Verify items against batch signatures produced by sign_batch.
+        
+        Each item costs log2(N) hashes; the root signature is verified once
+        per distinct Merkle root.
+        
+        Args:
+            key_id: Identifier of the verification key
+            items: Data items to verify
+            signatures: Batch signatures matching the items
+            algorithm: Verification algorithm (RSA-PSS or ECDSA)
+            
+        Returns:
+            True if all signatures are valid
+            
+        Raises:
+            HSMError: If verification fails
+        """
+        try:
+            if len(items) != len(signatures):
+                raise HSMError("Number of items and signatures must match")
+            
+            roots: Dict[Tuple[bytes, bytes], None] = {}
+            for item, batch_signature in zip(items, signatures):
+                index = int.from_bytes(batch_signature[:4], "big")
+                depth = batch_signature[4]
+                proof_end = 5 + depth * MERKLE_DIGEST_SIZE
+                
+                node = self._merkle_leaf(item)
+                for offset in range(5, proof_end, MERKLE_DIGEST_SIZE):
+                    sibling = batch_signature[offset:offset + MERKLE_DIGEST_SIZE]
+                    if index & 1:
+                        node = self._merkle_node(sibling, node)
+                    else:
+                        node = self._merkle_node(node, sibling)
+                    index >>= 1
+                
+                roots[(node, batch_signature[proof_end:])] = None
+            
+            for root, root_signature in roots:
+                self.verify(key_id, root, root_signature, algorithm)
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"HSM batch verification failed: {str(e)}")
+            raise HSMError(f"Failed to verify batch: {str(e)}")
+    
+    @staticmethod
+    def _merkle_leaf(item: bytes) -> bytes:
+        """Hash a data item into a Merkle leaf"""
+        return hashlib.blake2b(MERKLE_LEAF_PREFIX + item, digest_size=MERKLE_DIGEST_SIZE).digest()
+    
+    @staticmethod
+    def _merkle_node(left: bytes, right: bytes) -> bytes:
+        """Hash two child nodes into their Merkle parent"""
+        return hashlib.blake2b(MERKLE_NODE_PREFIX + left + right, digest_size=MERKLE_DIGEST_SIZE).digest()
+    
+    @staticmethod
+    def _merkle_levels(leaves: List[bytes]) -> List[List[bytes]]:
+        """Build all Merkle tree levels from leaves up to the root"""
+        # Hash state with the node prefix absorbed once; copied for each parent
+        node_state = hashlib.blake2b(MERKLE_NODE_PREFIX, digest_size=MERKLE_DIGEST_SIZE)
+        copy_state = node_state.copy
+        
+        levels = [leaves]
+        level = leaves
+        while len(level) > 1:
+            if len(level) % 2:
+                # Duplicate the last node so every node has a sibling
+                level.append(level[-1])
+            parents = []
+            append = parents.append
+            for left, right in zip(level[0::2], level[1::2]):
+                state = copy_state()
+                state.update(left + right)
+                append(state.digest())
+            levels.append(parents)
+            level = parents
+        return levels
+    
     def encrypt(self, key_id: str, data: bytes) -> bytes:
         """
         Encrypt data using HSM-stored key.
@@ -211,22 +549,14 @@ class HSM:
             HSMError: If encryption fails
         """
         try:
-            key = self._get_key_from_hsm(key_id)
-            
-            # Generate random IV
-            iv = os.urandom(16)
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(key),
-                modes.GCM(iv),
-            )
+            aead = self._get_aead(key_id)
+            key_data = self.active_keys[key_id]
             
-            encryptor = cipher.encryptor()
-            encrypted_data = encryptor.update(data) + encryptor.finalize()
+            # Deterministic 96-bit IV: fixed field + invocation counter (SP 800-38D 8.2.1)
+            iv = key_data["nonce_prefix"] + next(key_data["nonce_counter"]).to_bytes(8, "big")
             
-            # Return IV + tag + encrypted data
-            return iv + encryptor.tag + encrypted_data
+            # Return IV + encrypted data (AESGCM appends the tag)
+            return iv + aead.encrypt(iv, data, None)
             
         except Exception as e:
             self.logger.error(f"HSM encryption failed: {str(e)}")
@@ -238,7 +568,7 @@ class HSM:
         
         Args:
             key_id: Identifier of the decryption key
-            encrypted_data: Encrypted data (IV + tag + data)
+            encrypted_data: Encrypted data (IV + data + tag)
             
         Returns:
             Decrypted data bytes
@@ -247,21 +577,10 @@ class HSM:
             HSMError: If decryption fails
         """
         try:
-            key = self._get_key_from_hsm(key_id)
-            
-            # Extract IV, tag, and encrypted data
-            iv = encrypted_data[:16]
-            tag = encrypted_data[16:32]
-            ciphertext = encrypted_data[32:]
+            aead = self._get_aead(key_id)
             
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(key),
-                modes.GCM(iv, tag),
-            )
-            
-            decryptor = cipher.decryptor()
-            return decryptor.update(ciphertext) + decryptor.finalize()
+            # Extract IV and encrypted data (tag is verified by AESGCM)
+            return aead.decrypt(encrypted_data[:12], encrypted_data[12:], None)
             
         except Exception as e:
             self.logger.error(f"HSM decryption failed: {str(e)}")
@@ -270,12 +589,16 @@ class HSM:
     def _store_key_in_hsm(self, private_key: Any, algorithm: str) -> str:
         """Store key in HSM storage"""
         key_id = self._generate_key_id()
+        now_ns = time.monotonic_ns()
         self.active_keys[key_id] = {
             "key": private_key,
             "algorithm": algorithm,
-            "created_at": datetime.datetime.now(),
-            "last_used": datetime.datetime.now()
+            "created_ns": now_ns,
+            "last_used_ns": now_ns,
+            "nonce_prefix": _rand.take(4),
+            "nonce_counter": itertools.count()
         }
+        heapq.heappush(self._expiry_heap, (now_ns, key_id))
         return key_id
     
     def _get_key_from_hsm(self, key_id: str) -> Any:
@@ -285,9 +608,26 @@ class HSM:
             raise HSMError(f"Key not found in HSM: {key_id}")
             
         # Update last used time
-        key_data["last_used"] = datetime.datetime.now()
+        key_data["last_used_ns"] = time.monotonic_ns()
         return key_data["key"]
     
+    def _get_aead(self, key_id: str) -> AESGCM:
+        """Return the AEAD context for a key, building it on first use"""
+        key = self._get_key_from_hsm(key_id)
+        key_data = self.active_keys[key_id]
+        
+        # Cache the keyed context so the AES key schedule runs once per key
+        aead = key_data.get("aead")
+        if aead is None:
+            aead = key_data["aead"] = AESGCM(key)
+        return aead
+    
+    @staticmethod
+    def _monotonic_ns_to_iso(timestamp_ns: int) -> str:
+        """Convert a monotonic timestamp to a wall-clock ISO string"""
+        elapsed = datetime.timedelta(microseconds=(time.monotonic_ns() - timestamp_ns) // 1000)
+        return (datetime.datetime.now() - elapsed).isoformat()
+    
     def _serialize_public_key(self, public_key: Any, algorithm: str) -> str:
         """Serialize public key to PEM format"""
         if algorithm.upper() == "RSA":
@@ -304,20 +644,7 @@ class HSM:
     
     def _generate_key_id(self) -> str:
         """Generate unique key identifier"""
-        return base64.urlsafe_b64encode(os.urandom(16)).decode().rstrip('=')
-    
-    def rotate_keys(self) -> None:
-        """Rotate keys that have exceeded their rotation period"""
-        current_time = datetime.datetime.now()
-        expired_keys = []
-        
-        for key_id, key_data in self.active_keys.items():
-            if current_time - key_data["created_at"] > self.key_rotation_interval:
-                expired_keys.append(key_id)
-        
-        for key_id in expired_keys:
-            del self.active_keys[key_id]
-            self.logger.info(f"Key rotated: {key_id}")
+        return secrets.token_hex(16)
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get HSM system metrics"""
@@ -330,71 +657,92 @@ class HSM:
         }
         return metrics
     
-    def _store_key_in_hsm(self, private_key: Any) -> None:
-        """Store key securely in HSM"""
-        # This would interface with actual HSM hardware
-        # For now, we simulate the storage
-        key_id = self._generate_key_id()
-        self.logger.info(f"Key {key_id} stored in HSM")
-    
-    def _generate_key_id(self) -> str:
-        """Generate unique key identifier"""
-        return f"HSM_KEY_{int(time.time())}_{os.urandom(16).hex()}"
-    
     def encrypt_data(self, data: bytes, public_key: bytes) -> bytes:
-        """Encrypt data using HSM"""
+        """
+        Envelope-encrypt data using HSM.
+        
+        The data is encrypted with a fresh AES-256-GCM data key and only that
+        key is wrapped with RSA-OAEP, so payload size is not limited by the
+        RSA modulus. Output layout is
+        wrapped key length (2 bytes) + wrapped key + IV + ciphertext + tag.
+        """
         try:
-            public_key = serialization.load_pem_public_key(public_key)
-            encrypted = public_key.encrypt(
-                data,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None
-                )
-            )
-            return encrypted
+            public_key = _load_pem(public_key)
+            
+            data_key = AESGCM.generate_key(bit_length=256)
+            iv = _rand.take(12)
+            ciphertext = AESGCM(data_key).encrypt(iv, data, None)
+            wrapped_key = public_key.encrypt(data_key, self._oaep)
+            
+            return len(wrapped_key).to_bytes(2, "big") + wrapped_key + iv + ciphertext
         except Exception as e:
             self.logger.error(f"HSM encryption failed: {str(e)}")
             raise HSMError(f"Failed to encrypt data: {str(e)}")
     
     def decrypt_data(self, encrypted_data: bytes, key_id: str) -> bytes:
-        """Decrypt data using HSM"""
+        """Decrypt data produced by encrypt_data using HSM"""
         try:
             # In real HSM, this would use the key_id to retrieve the private key
-            # For simulation, we use a dummy key
-            private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=4096
-            )
-            
-            decrypted = private_key.decrypt(
-                encrypted_data,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None
+            # For simulation, we use a dummy key generated once per process
+            if HSM._DUMMY_KEY is None:
+                HSM._DUMMY_KEY = rsa.generate_private_key(
+                    public_exponent=65537,
+                    key_size=4096
                 )
-            )
-            return decrypted
+            
+            # Unwrap the data key, then decrypt and authenticate the payload
+            wrapped_length = int.from_bytes(encrypted_data[:2], "big")
+            wrapped_end = 2 + wrapped_length
+            data_key = HSM._DUMMY_KEY.decrypt(encrypted_data[2:wrapped_end], self._oaep)
+            
+            iv = encrypted_data[wrapped_end:wrapped_end + 12]
+            return AESGCM(data_key).decrypt(iv, encrypted_data[wrapped_end + 12:], None)
         except Exception as e:
             self.logger.error(f"HSM decryption failed: {str(e)}")
             raise HSMError(f"Failed to decrypt data: {str(e)}")
     
     def rotate_keys(self) -> None:
-        """Rotate keys according to policy"""
+        """Rotate keys that have exceeded their rotation period"""
         try:
-            # Generate new key pair
-            key_info = self.generate_key_pair()
-            
-            # Store old key for backup
-            self._store_backup_key(key_info["key_id"])
-            
-            self.logger.info(f"Keys rotated successfully. New key ID: {key_info['key_id']}")
+            now_ns = time.monotonic_ns()
+            heap = self._expiry_heap
+            
+            while heap and now_ns - heap[0][0] > self._key_rotation_interval_ns:
+                created_ns, key_id = heapq.heappop(heap)
+                
+                # Skip tombstones for keys removed outside of rotation
+                key_data = self.active_keys.get(key_id)
+                if key_data is None or key_data["created_ns"] != created_ns:
+                    continue
+                
+                # Store old key for backup
+                self._store_backup_key(key_id)
+                del self.active_keys[key_id]
+                self._forget_verifications(key_id)
+                
+                # Generate replacement key pair
+                key_info = self.generate_key_pair(key_data["algorithm"])
+                
+                self.logger.info(f"Key rotated: {key_id}. New key ID: {key_info['key_id']}")
         except Exception as e:
             self.logger.error(f"Key rotation failed: {str(e)}")
             raise HSMError(f"Failed to rotate keys: {str(e)}")
     
+    def _forget_verifications(self, key_id: str) -> None:
+        """Drop cached verifications so signatures by a retired key stop verifying"""
+        with self._verify_cache_lock:
+            stale = [cache_key for cache_key in self._verify_cache if cache_key[0] == key_id]
+            for cache_key in stale:
+                del self._verify_cache[cache_key]
+    
     def _store_backup_key(self, key_id: str) -> None:
         """Store backup of key in HSM"""
         self.logger.info(f"Backup key {key_id} stored in HSM")
+    
+    def store_audit_record(self, encrypted_record: bytes) -> str:
+        """Store an encrypted audit record in HSM-backed audit storage"""
+        # This would interface with actual HSM hardware
+        # For now, we simulate the storage
+        record_id = self._generate_key_id()
+        self.logger.info(f"Audit record {record_id} stored in HSM")
+        return record_id
@@ -6,15 +6,40 @@ This module implements a secure key exchange protocol using TLS 1.3.
 
 from typing import Dict, Any, Optional
 import logging
+import queue
 import ssl
 import socket
+import threading
+import weakref
 from cryptography.hazmat.primitives.asymmetric import x25519
 from cryptography.hazmat.primitives import serialization
 
+logger = logging.getLogger(__name__)
+
+# How often a filler blocked on a full key pool checks whether to stop
+KEY_POOL_POLL_SECONDS = 1.0
+
 class KeyExchangeError(Exception):
     """Raised when key exchange fails"""
     pass
 
+def _fill_key_pool(owner_ref: "weakref.ref[KeyExchange]", pool: queue.Queue,
+                   stop: threading.Event) -> None:
+    """Keep a key pool topped up until stopped or its KeyExchange is collected"""
+    while not stop.is_set() and owner_ref() is not None:
+        try:
+            private_key = x25519.X25519PrivateKey.generate()
+        except Exception as e:
+            logger.error(f"Key pool refill failed: {str(e)}")
+            return
+        while not stop.is_set():
+            try:
+                pool.put(private_key, timeout=KEY_POOL_POLL_SECONDS)
+                break
+            except queue.Full:
+                if owner_ref() is None:
+                    return
+
 class KeyExchange:
     def __init__(self, config: Dict[str, Any]):
         """Initialize key exchange with configuration"""
@@ -24,11 +49,37 @@ class KeyExchange:
         
         if self.protocol != "TLS 1.3":
             raise KeyExchangeError("Only TLS 1.3 is supported for enterprise security")
+        
+        # Build the TLS context once; loading the CA bundle is expensive
+        self._ctx = ssl.create_default_context()
+        self._ctx.minimum_version = ssl.TLSVersion.TLSv1_3
+        self._ctx.maximum_version = ssl.TLSVersion.TLSv1_3
+        
+        # Pool of pre-generated ephemeral keys, each handed out exactly once
+        # The filler holds only a weak reference, so it exits once this
+        # instance is collected or closed
+        self._pool: queue.Queue = queue.Queue(maxsize=config.get("key_pool_size", 32))
+        self._pool_stop = threading.Event()
+        self._pool_filler = threading.Thread(
+            target=_fill_key_pool,
+            args=(weakref.ref(self), self._pool, self._pool_stop),
+            name="key-exchange-pool-filler",
+            daemon=True
+        )
+        self._pool_filler.start()
+        weakref.finalize(self, self._pool_stop.set)
+    
+    def close(self) -> None:
+        """Stop refilling the ephemeral key pool"""
+        self._pool_stop.set()
     
     def generate_key_pair(self) -> Dict[str, Any]:
         """Generate key pair for key exchange"""
         try:
-            private_key = x25519.X25519PrivateKey.generate()
+            try:
+                private_key = self._pool.get_nowait()
+            except queue.Empty:
+                private_key = x25519.X25519PrivateKey.generate()
             public_key = private_key.public_key()
             
             return {
@@ -42,12 +93,12 @@ class KeyExchange:
     def establish_secure_channel(self, host: str, port: int) -> ssl.SSLSocket:
         """Establish secure TLS 1.3 channel"""
         try:
-            context = ssl.create_default_context()
-            context.minimum_version = ssl.TLSVersion.TLSv1_3
-            context.maximum_version = ssl.TLSVersion.TLSv1_3
-            
             sock = socket.create_connection((host, port))
-            secure_sock = context.wrap_socket(sock, server_hostname=host)
+            
+            # Disable Nagle so the small key-exchange messages are sent immediately
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
+            secure_sock = self._ctx.wrap_socket(sock, server_hostname=host)
             
             return secure_sock
         except Exception as e:
@@ -70,9 +121,16 @@ class KeyExchange:
             )
             secure_sock.sendall(public_key_bytes)
             
-            # Receive peer's public key
-            peer_public_key_bytes = secure_sock.recv(32)
-            peer_public_key = x25519.X25519PublicKey.from_public_bytes(peer_public_key_bytes)
+            # Receive exactly 32 bytes of peer's public key
+            buf = bytearray(32)
+            view = memoryview(buf)
+            received = 0
+            while received < 32:
+                n = secure_sock.recv_into(view[received:])
+                if not n:
+                    raise KeyExchangeError("Connection closed before peer public key was received")
+                received += n
+            peer_public_key = x25519.X25519PublicKey.from_public_bytes(bytes(buf))
             
             # Generate shared secret
             shared_secret = keys["private_key"].exchange(peer_public_key)
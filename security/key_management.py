@@ -9,14 +9,17 @@ This module implements a secure key management system that:
 """
 
 import os
+import ctypes
+import ctypes.util
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Any, Optional, Dict
 import base64
 import hashlib
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.backends import default_backend
 from config.secrets_manager import SecretsManager
@@ -48,8 +51,16 @@ class SecureKeyManager:
         # Initialize secrets manager
         self.secrets_manager = SecretsManager()
         
-        # Load or generate master key
-        self.master_key = self._load_master_key()
+        # Load or generate master key into a pinned buffer that is overwritten
+        # in place on rotation instead of leaving old key copies to the GC
+        master_key = self._load_master_key()
+        self._mk_buf = ctypes.create_string_buffer(len(master_key))
+        self._lock_memory(self._mk_buf)
+        ctypes.memmove(self._mk_buf, master_key, len(master_key))
+        
+        # Derived keys and their salts, cached per purpose
+        self._derived: Dict[str, bytes] = {}
+        self._derived_salt: Dict[str, bytes] = {}
         
     def _load_master_key(self) -> bytes:
         """Securely load or generate master key"""
@@ -71,27 +82,50 @@ class SecureKeyManager:
             logger.error(f"Failed to load master key: {str(e)}")
             raise KeyManagementError("Failed to initialize key manager")
             
+    @property
+    def master_key(self) -> memoryview:
+        """View of the master key held in the pinned buffer"""
+        return memoryview(self._mk_buf).cast("B")
+    
+    @staticmethod
+    def _lock_memory(buffer: ctypes.Array) -> None:
+        """Best-effort mlock of a buffer so the key is never swapped to disk"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            if libc.mlock(ctypes.addressof(buffer), ctypes.c_size_t(ctypes.sizeof(buffer))) != 0:
+                logger.warning(f"mlock failed for master key buffer: {os.strerror(ctypes.get_errno())}")
+        except (OSError, AttributeError) as e:
+            logger.warning(f"mlock unavailable for master key buffer: {str(e)}")
+    
     def _generate_key(self) -> bytes:
         """Generate a secure encryption key"""
         return os.urandom(self.key_size)
         
     def derive_key(self, purpose: str) -> bytes:
         """Derive a key for specific purpose using HKDF"""
+        derived = self._derived.get(purpose)
+        if derived is not None:
+            return derived
+        
         try:
-            # Generate salt
-            salt = os.urandom(self.salt_length)
-            
-            # Derive key using HKDF
-            kdf = PBKDF2HMAC(
+            # Reuse the purpose's salt so keys re-derive deterministically after rotation
+            salt = self._derived_salt.get(purpose)
+            if salt is None:
+                salt = self._derived_salt[purpose] = os.urandom(self.salt_length)
+            
+            # Derive key using HKDF; the master key is already high-entropy,
+            # so no password stretching is needed
+            kdf = HKDF(
                 algorithm=hashes.SHA256(),
                 length=self.key_size,
                 salt=salt,
-                iterations=100000,
+                info=purpose.encode(),
                 backend=default_backend()
             )
             
-            # Use purpose as info parameter
-            return kdf.derive(self.master_key + purpose.encode())
+            # Use master key as input keying material
+            derived = self._derived[purpose] = kdf.derive(self.master_key)
+            return derived
             
         except Exception as e:
             logger.error(f"Failed to derive key: {str(e)}")
@@ -118,8 +152,13 @@ class SecureKeyManager:
             # Store encrypted key
             self.secrets_manager.set_secret("MASTER_KEY", base64.b64encode(new_master_key).decode())
             
-            # Update current key
-            self.master_key = new_master_key
+            # Overwrite current key in place
+            if len(new_master_key) != ctypes.sizeof(self._mk_buf):
+                raise KeyManagementError("New master key size does not match key buffer")
+            ctypes.memmove(self._mk_buf, new_master_key, len(new_master_key))
+            
+            # Invalidate keys derived from the old master key
+            self._derived.clear()
             
             # Secure delete old key
             self.secrets_manager.secure_delete("MASTER_KEY")
@@ -133,12 +172,11 @@ class SecureKeyManager:
     def encrypt_key(self, key: bytes, encryption_key: bytes) -> bytes:
         """Encrypt a key using another key"""
         try:
-            # Generate IV
-            iv = os.urandom(16)
+            # Generate 96-bit IV
+            iv = os.urandom(12)
             
-            # Encrypt using AES-256
-            cipher = AES.new(encryption_key, AES.MODE_CBC, iv)
-            return iv + cipher.encrypt(key)
+            # Encrypt using AES-256-GCM (authenticated, tag appended)
+            return iv + AESGCM(encryption_key).encrypt(iv, key, None)
             
         except Exception as e:
             logger.error(f"Failed to encrypt key: {str(e)}")
@@ -148,12 +186,11 @@ class SecureKeyManager:
         """Decrypt a key"""
         try:
             # Extract IV
-            iv = encrypted_key[:16]
-            encrypted = encrypted_key[16:]
+            iv = encrypted_key[:12]
+            encrypted = encrypted_key[12:]
             
-            # Decrypt using AES-256
-            cipher = AES.new(encryption_key, AES.MODE_CBC, iv)
-            return cipher.decrypt(encrypted)
+            # Decrypt and authenticate using AES-256-GCM
+            return AESGCM(encryption_key).decrypt(iv, encrypted, None)
             
         except Exception as e:
             logger.error(f"Failed to decrypt key: {str(e)}")
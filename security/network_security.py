@@ -4,20 +4,72 @@ Network Security System
 This module implements enterprise-grade network security controls.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+import functools
+import hmac
+import ipaddress
 import logging
+from collections import OrderedDict
+import os
+import re
+import secrets
 import socket
 import ssl
+import threading
+import time
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
+import numpy as np
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from security import serialization
 from security.hsm import HSM
 from security.audit_trail import AuditTrail
+from security.audit_flusher import audit_flusher
 from security.traffic_classifier import TrafficClassifier
 from security.packet_validator import PacketValidator
 from security.ddos_protection import DDoSProtection
 
 logger = logging.getLogger(__name__)
 
+# Rate limit table sizing
+RATE_TABLE_INITIAL_CAPACITY = 1024
+
+# Malicious payload patterns, compiled once into a single alternation and
+# applied only to fields that may legitimately carry free text
+MALICIOUS_PATTERNS = re.compile(
+    r"DROP TABLE|DELETE FROM|SELECT \* FROM|UNION SELECT",
+    re.IGNORECASE
+)
+
+# Structured request fields and their expected types. String-typed fields
+# must be single tokens, which rules out SQL without a pattern scan.
+REQUEST_FIELD_TYPES = {
+    "client_ip": str,
+    "client_port": int,
+    "protocol": str,
+    "protocol_version": str,
+    "tls_version": str,
+    "cipher_suite": str,
+    "tls_session_id": (str, bytes),
+    "tls_session_ticket": bytes,
+    "hmac": (str, bytes)
+}
+STRUCTURED_TOKEN = re.compile(r"[A-Za-z0-9_.:/+=\-]*")
+
+@functools.lru_cache(maxsize=65536)
+def _is_valid_ip(ip: str) -> bool:
+    """Check IP address format, caching results for repeat clients"""
+    # Strict dotted-quad IPv4 fast path in C; fall back to ipaddress for IPv6
+    try:
+        socket.inet_pton(socket.AF_INET, ip)
+        return True
+    except (OSError, TypeError):
+        pass
+    try:
+        ipaddress.ip_address(ip)
+        return True
+    except ValueError:
+        return False
+
 class NetworkSecurityError(Exception):
     """Raised when network security operations fail"""
     pass
@@ -33,6 +85,9 @@ class NetworkSecurity:
     - Encryption
     """
     
+    # Protocols accepted by _validate_protocol
+    _ALLOWED_PROTOCOLS = frozenset({"HTTPS", "TLS"})
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize network security controls.
@@ -43,12 +98,36 @@ class NetworkSecurity:
                 - ip_whitelist: List of whitelisted IPs
                 - ip_blacklist: List of blacklisted IPs
                 - encryption_key: Key for request encryption
+                - packet_integrity_key: Shared key for packet HMAC verification
+                - tls_rotation_seconds: Interval between TLS key re-initializations
+                - max_tls_sessions: Capacity of the TLS session cache
+                - max_connection_states: Capacity of the connection state table
+                - max_rate_limit_states: Capacity of the per-IP rate limit table
+                - audit_batch_size: Audit records encrypted and stored per batch
+                - audit_flush_interval: Maximum seconds a record waits in the batch
+                - audit_key_rotation_seconds: Lifetime of the local audit encryption key
+                - hsm_public_key: PEM public key that HSM-wrapped keys and rules are
+                  encrypted to; a fresh HSM key pair is generated if omitted
         """
         self.config = config
+        self.logger = logging.getLogger(__name__)
         self.rate_limits = config.get("rate_limits", {})
+        self._rate_window_ns = int(self.rate_limits.get("time_window_seconds", 0) * 1_000_000_000)
         self.ip_whitelist = config.get("ip_whitelist", [])
         self.ip_blacklist = config.get("ip_blacklist", [])
+        
+        # Compile IP policies: exact addresses as frozensets, CIDR ranges as
+        # per-prefix-length sets of masked network numbers
+        self.blocked_ips, self._blocked_networks = self._compile_ip_policy(self.ip_blacklist)
+        self.allowed_ips, self._allowed_networks = self._compile_ip_policy(self.ip_whitelist)
         self.encryption_key = config.get("encryption_key")
+        
+        # Keyed HMAC state with the ipad/opad blocks absorbed once; copied per packet
+        packet_integrity_key = config.get("packet_integrity_key")
+        self._packet_hmac = (
+            hmac.new(packet_integrity_key.encode(), digestmod="sha256")
+            if packet_integrity_key else None
+        )
         self.request_counters = {}
         
         # Security parameters
@@ -66,8 +145,11 @@ class NetworkSecurity:
         
         # Initialize security components
         self.hsm = HSM(config)
+        hsm_public_key = config.get("hsm_public_key") or self.hsm.generate_key_pair()["public_key"]
+        self._hsm_public_key = hsm_public_key.encode() if isinstance(hsm_public_key, str) else hsm_public_key
         self.audit = AuditTrail(config)
-        self.fernet = Fernet(Fernet.generate_key())
+        self._aead = AESGCM(AESGCM.generate_key(bit_length=256))
+        self._ticket_aead = AESGCM(AESGCM.generate_key(bit_length=256))
         self.traffic_classifier = TrafficClassifier(config)
         self.packet_validator = PacketValidator(config)
         self.ddos = DDoSProtection(config)
@@ -83,17 +165,72 @@ class NetworkSecurity:
             "segments_config": {}
         }
         
-        # Initialize security state
-        self.connection_state = {}
-        self.rate_limit_state = {}
-        self.tls_session_cache = {}
+        # Initialize security state as bounded LRU tables
+        self.connection_state: OrderedDict = OrderedDict()
+        self.tls_session_cache: OrderedDict = OrderedDict()
+        self.max_tls_sessions = config.get("max_tls_sessions", 4096)
+        self.max_connection_states = config.get("max_connection_states", 16384)
+        self.max_rate_limit_states = config.get("max_rate_limit_states", 65536)
+        
+        # Per-IP rate limit state as structure-of-arrays: an LRU map of
+        # ip -> slot plus request counts and window starts indexed by slot
+        self._rate_index: OrderedDict = OrderedDict()
+        capacity = min(RATE_TABLE_INITIAL_CAPACITY, self.max_rate_limit_states)
+        self._rate_counts = np.zeros(capacity, dtype=np.uint32)
+        self._rate_reset_ns = np.zeros(capacity, dtype=np.int64)
         self.packet_fragmentation = {}
         
+        # Pending audit records, encrypted and stored in batches
+        self.audit_batch_size = config.get("audit_batch_size", 64)
+        self.audit_flush_interval = config.get("audit_flush_interval", 1.0)
+        self._audit_buf: List[Dict[str, Any]] = []
+        self._audit_flush_at = time.monotonic() + self.audit_flush_interval
+        self._audit_lock = threading.Lock()
+        
+        # Records that see no follow-up traffic are flushed by the shared
+        # background flusher and at exit
+        audit_flusher.register(self, self.audit_flush_interval)
+        
+        # Audit batches are sealed locally; the HSM only wraps each audit key
+        self.audit_key_rotation_seconds = config.get("audit_key_rotation_seconds", 3600)
+        self._rotate_audit_key()
+        
         # Initialize network isolation
         self._initialize_network_isolation()
         
         # Initialize DDoS protection
         self._initialize_ddos_protection()
+        
+        # Initialize TLS once; validate_network_access only re-initializes on rotation
+        self.tls_rotation_seconds = config.get("tls_rotation_seconds", 3600)
+        self._initialize_tls()
+        
+        # Access checks as (check, error) pairs. Cheap stateless checks run
+        # first, then the HMAC, so unauthenticated requests never touch rate
+        # limit or connection state and never reach HSM-backed checks
+        self._access_checks = (
+            (lambda request, serialized: self._validate_ip(request.get("client_ip", "")),
+             "Invalid IP address"),
+            (lambda request, serialized: self._check_ip_policy(request.get("client_ip", "")),
+             "IP access denied"),
+            (lambda request, serialized: self._validate_protocol(request),
+             "Invalid protocol"),
+            (lambda request, serialized: self._inspect_packet(request, serialized=serialized),
+             "Malformed packet"),
+            (lambda request, serialized: self._verify_packet_integrity(request, serialized=serialized),
+             "Packet integrity check failed"),
+            (lambda request, serialized: self._check_rate_limit(request.get("client_ip", "")),
+             "Rate limit exceeded"),
+            (lambda request, serialized: self.ddos.check_request(request),
+             "DDoS protection triggered"),
+            (lambda request, serialized: self._validate_tls(request),
+             "TLS validation failed"),
+            (lambda request, serialized: self._check_network_isolation(request.get("client_ip", "")),
+             "Network isolation violation"),
+            (lambda request, serialized: self._validate_connection_state(
+                request.get("client_ip", ""), request.get("client_port", 0)),
+             "Invalid connection state"),
+        )
     
     def _initialize_network_isolation(self) -> None:
         """Initialize strict network isolation"""
@@ -118,7 +255,7 @@ class NetworkSecurity:
             
             # Configure HSM-encrypted rules
             rules = self.hsm.encrypt_data(
-                json.dumps(segment_config).encode()
+                serialization.dumps(segment_config), self._hsm_public_key
             )
             
             # Store in secure segment configuration
@@ -167,69 +304,50 @@ class NetworkSecurity:
             self.logger.error(f"DDoS protection initialization failed: {str(e)}")
             raise NetworkSecurityError(f"Failed to initialize DDoS protection: {str(e)}")
     
-    def _handle_packet_fragmentation(self, packet: bytes) -> List[bytes]:
-        """Handle secure packet fragmentation"""
+    def _handle_packet_fragmentation(self, packet: bytes) -> List[memoryview]:
+        """
+        Handle secure packet fragmentation.
+        
+        The whole packet is sealed with a single AES-GCM call and the sealed
+        buffer (nonce + ciphertext + tag) is split into fragments; the
+        receiver reassembles the fragments in order and opens them once.
+        Fragments are zero-copy views into one contiguous sealed buffer.
+        """
         try:
             # Get maximum fragment size from HSM
             max_fragment_size = self.hsm.get_max_fragment_size()
             
-            # Fragment packet
-            fragments = []
-            for i in range(0, len(packet), max_fragment_size):
-                fragment = packet[i:i + max_fragment_size]
-                encrypted_fragment = self.hsm.encrypt_data(fragment)
-                fragments.append(encrypted_fragment)
+            # Encrypt once locally; HSM is reserved for key wrapping
+            encrypted_packet = memoryview(self._aead_encrypt(packet))
             
-            return fragments
+            # Fragment the sealed packet without copying
+            return [
+                encrypted_packet[i:i + max_fragment_size]
+                for i in range(0, len(encrypted_packet), max_fragment_size)
+            ]
         except Exception as e:
             self.logger.error(f"Packet fragmentation failed: {str(e)}")
             raise NetworkSecurityError(f"Failed to fragment packet: {str(e)}")
     
+    def _aead_encrypt(self, data: bytes) -> bytes:
+        """Encrypt data with the local AES-256-GCM key (nonce + ciphertext + tag)"""
+        nonce = os.urandom(12)
+        return nonce + self._aead.encrypt(nonce, data, None)
+    
     def validate_network_access(self, request: Dict[str, Any]) -> bool:
         """Validate network access with comprehensive security"""
         try:
-            # Initialize TLS first
-            self._initialize_tls()
-            
-            # Check DDoS protection
-            if not self.ddos.check_request(request):
-                raise NetworkSecurityError("DDoS protection triggered")
-            
-            # Validate TLS connection
-            if not self._validate_tls(request):
-                raise NetworkSecurityError("TLS validation failed")
-            
-            # Get client information
-            client_ip = request.get("client_ip", "")
-            client_port = request.get("client_port", 0)
+            # Re-initialize TLS only when its rotation period has elapsed
+            if time.monotonic() >= self._tls_rotate_at:
+                self._initialize_tls()
             
-            # Check network isolation
-            if not self._check_network_isolation(client_ip):
-                raise NetworkSecurityError("Network isolation violation")
+            # Serialize once, canonically, for size checks and HMAC input
+            serialized = self._serialize_request(request)
             
-            # IP address validation
-            if not self._validate_ip(client_ip):
-                raise NetworkSecurityError("Invalid IP address")
-            
-            # IP whitelist/blacklist check
-            if not self._check_ip_policy(client_ip):
-                raise NetworkSecurityError("IP access denied")
-            
-            # Rate limiting
-            if not self._check_rate_limit(client_ip):
-                raise NetworkSecurityError("Rate limit exceeded")
-            
-            # Protocol validation
-            if not self._validate_protocol(request):
-                raise NetworkSecurityError("Invalid protocol")
-            
-            # Packet inspection
-            if not self._inspect_packet(request):
-                raise NetworkSecurityError("Malformed packet")
-            
-            # Connection state validation
-            if not self._validate_connection_state(client_ip, client_port):
-                raise NetworkSecurityError("Invalid connection state")
+            # Run access checks, cheapest and most selective first
+            for check, error in self._access_checks:
+                if not check(request, serialized):
+                    raise NetworkSecurityError(error)
             
             # Log secure audit trail
             self._log_secure_audit(request)
@@ -303,11 +421,12 @@ class NetworkSecurity:
             # Configure TLS parameters
             self.tls_config = {
                 "version": self.tls_version,
-                "cipher_suites": self.tls_cipher_suites,
+                "cipher_suites": self.cipher_suites,
                 "key_exchange": "X25519",
                 "signature_algorithm": "Ed25519",
                 "key_id": tls_keys["key_id"]
             }
+            self._tls_rotate_at = time.monotonic() + self.tls_rotation_seconds
             
             self.logger.info("TLS 1.3 initialized with strict security")
         except Exception as e:
@@ -322,14 +441,31 @@ class NetworkSecurity:
                 raise NetworkSecurityError("TLS version not supported")
             
             # Check cipher suite
-            if request.get("cipher_suite") not in self.tls_cipher_suites:
+            if request.get("cipher_suite") not in self.cipher_suites:
                 raise NetworkSecurityError("Cipher suite not supported")
             
-            # Validate TLS session
+            # Validate TLS session, purging it lazily once expired
             session_id = request.get("tls_session_id")
-            if session_id not in self.tls_session_cache:
+            session = self.tls_session_cache.get(session_id)
+            if session is not None and session["expires"] <= datetime.now():
+                del self.tls_session_cache[session_id]
+                session = None
+            
+            if session is None:
+                # Resume statelessly from a session ticket when one is presented
+                ticket = request.get("tls_session_ticket")
+                session = self._resume_session_ticket(ticket) if ticket else None
+                if session is not None:
+                    if session_id is None:
+                        session_id = request["tls_session_id"] = self._generate_session_id()
+                    self.tls_session_cache[session_id] = session
+                    self._touch_lru(self.tls_session_cache, session_id, self.max_tls_sessions)
+            
+            if session is None:
                 # Perform full TLS handshake
                 self._perform_tls_handshake(request)
+            else:
+                self.tls_session_cache.move_to_end(session_id)
             
             return True
         except NetworkSecurityError as e:
@@ -356,27 +492,56 @@ class NetworkSecurity:
             
             # Cache session
             session_id = self._generate_session_id()
-            self.tls_session_cache[session_id] = {
+            session = {
                 "keys": session_keys,
                 "expires": datetime.now() + timedelta(hours=1)
             }
+            self.tls_session_cache[session_id] = session
+            self._touch_lru(self.tls_session_cache, session_id, self.max_tls_sessions)
             
             request["tls_session_id"] = session_id
+            request["tls_session_ticket"] = self._issue_session_ticket(session)
             
             self.logger.info("TLS handshake completed successfully")
         except Exception as e:
             self.logger.error(f"TLS handshake failed: {str(e)}")
             raise NetworkSecurityError(f"TLS handshake failed: {str(e)}")
     
+    def _issue_session_ticket(self, session: Dict[str, Any]) -> bytes:
+        """Seal session state into a ticket the client presents for resumption"""
+        payload = serialization.dumps({
+            "keys": {name: value.hex() for name, value in session["keys"].items()},
+            "expires": session["expires"].timestamp()
+        })
+        nonce = os.urandom(12)
+        return nonce + self._ticket_aead.encrypt(nonce, payload, None)
+    
+    def _resume_session_ticket(self, ticket: bytes) -> Optional[Dict[str, Any]]:
+        """Open a session ticket, returning its session or None if invalid or expired"""
+        try:
+            payload = serialization.loads(self._ticket_aead.decrypt(ticket[:12], ticket[12:], None))
+        except Exception as e:
+            self.logger.warning(f"Rejected TLS session ticket: {str(e)}")
+            return None
+        
+        expires = datetime.fromtimestamp(payload["expires"])
+        if expires <= datetime.now():
+            return None
+        
+        return {
+            "keys": {name: bytes.fromhex(value) for name, value in payload["keys"].items()},
+            "expires": expires
+        }
+    
     def _derive_session_keys(self, shared_secret: bytes) -> Dict[str, bytes]:
         """Derive session keys with HSM"""
         try:
             # Use HSM for key derivation
             return {
-                "client_write_key": self.hsm.encrypt_data(shared_secret[:16]),
-                "server_write_key": self.hsm.encrypt_data(shared_secret[16:32]),
-                "client_write_iv": self.hsm.encrypt_data(shared_secret[32:48]),
-                "server_write_iv": self.hsm.encrypt_data(shared_secret[48:64])
+                "client_write_key": self.hsm.encrypt_data(shared_secret[:16], self._hsm_public_key),
+                "server_write_key": self.hsm.encrypt_data(shared_secret[16:32], self._hsm_public_key),
+                "client_write_iv": self.hsm.encrypt_data(shared_secret[32:48], self._hsm_public_key),
+                "server_write_iv": self.hsm.encrypt_data(shared_secret[48:64], self._hsm_public_key)
             }
         except Exception as e:
             self.logger.error(f"Key derivation failed: {str(e)}")
@@ -385,152 +550,147 @@ class NetworkSecurity:
     def _generate_session_id(self) -> bytes:
         """Generate secure TLS session ID"""
         try:
-            # Use HSM for secure random generation
-            return self.hsm.generate_key_pair()["key_id"].encode()
+            # Session IDs only need to be unguessable, not HSM-backed
+            return secrets.token_bytes(32)
         except Exception as e:
             self.logger.error(f"Session ID generation failed: {str(e)}")
             raise NetworkSecurityError(f"Failed to generate session ID: {str(e)}")
     
-    def validate_network_access(self, request: Dict[str, Any]) -> bool:
-        """Validate network access with strict security checks"""
-        try:
-            # Initialize TLS first
-            self._initialize_tls()
-            
-            # Validate TLS connection
-            if not self._validate_tls(request):
-                raise NetworkSecurityError("TLS validation failed")
-            
-            # Get client information
-            client_ip = request.get("client_ip", "")
-            client_port = request.get("client_port", 0)
-            
-            # IP address validation
-            if not self._validate_ip(client_ip):
-                raise NetworkSecurityError("Invalid IP address")
-            
-            # IP whitelist/blacklist check
-            if not self._check_ip_policy(client_ip):
-                raise NetworkSecurityError("IP access denied")
-            
-            # Rate limiting
-            if not self._check_rate_limit(client_ip):
-                raise NetworkSecurityError("Rate limit exceeded")
-            
-            # Protocol validation
-            if not self._validate_protocol(request):
-                raise NetworkSecurityError("Invalid protocol")
-            
-            # Packet inspection
-            if not self._inspect_packet(request):
-                raise NetworkSecurityError("Malformed packet")
-            
-            # Connection state validation
-            if not self._validate_connection_state(client_ip, client_port):
-                raise NetworkSecurityError("Invalid connection state")
-            
-            # Log secure audit trail
-            self._log_secure_audit(request)
-            
-            return True
-        except NetworkSecurityError as e:
-            self.logger.error(f"Network access denied: {str(e)}")
-            raise
-        except Exception as e:
-            self.logger.error(f"Network security error: {str(e)}")
-            raise NetworkSecurityError(f"Network security error: {str(e)}")
-    
     def _log_secure_audit(self, request: Dict[str, Any]) -> None:
         """Log secure audit trail with HSM"""
         try:
             # Create audit record
             audit_data = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
                 "client_ip": request.get("client_ip", ""),
                 "tls_session_id": request.get("tls_session_id", ""),
                 "status": "SUCCESS"
             }
             
-            # Encrypt audit data with HSM
-            encrypted_audit = self.hsm.encrypt_data(
-                json.dumps(audit_data).encode()
-            )
-            
-            # Store in secure audit log
-            self._store_secure_audit(encrypted_audit)
+            # Queue the record; flush when the batch is full or has waited long enough
+            with self._audit_lock:
+                self._audit_buf.append(audit_data)
+                if (len(self._audit_buf) < self.audit_batch_size
+                        and time.monotonic() < self._audit_flush_at):
+                    return
+                batch = self._take_audit_batch()
             
-            self.logger.info("Secure audit log created successfully")
+            self._write_audit_batch(batch)
         except Exception as e:
             self.logger.error(f"Audit logging failed: {str(e)}")
             raise NetworkSecurityError(f"Failed to create audit log: {str(e)}")
     
+    def flush_audit_log(self) -> None:
+        """Encrypt and store any pending audit records immediately"""
+        try:
+            with self._audit_lock:
+                batch = self._take_audit_batch()
+            
+            if batch:
+                self._write_audit_batch(batch)
+        except Exception as e:
+            self.logger.error(f"Audit flush failed: {str(e)}")
+            raise NetworkSecurityError(f"Failed to flush audit log: {str(e)}")
+    
+    def close(self) -> None:
+        """Stop background audit flushing and write out pending records"""
+        audit_flusher.unregister(self)
+        self.flush_audit_log()
+    
+    def _take_audit_batch(self) -> List[Dict[str, Any]]:
+        """Detach pending audit records; caller must hold the audit lock"""
+        batch, self._audit_buf = self._audit_buf, []
+        self._audit_flush_at = time.monotonic() + self.audit_flush_interval
+        return batch
+    
+    def _rotate_audit_key(self) -> None:
+        """Generate a new audit encryption key and wrap it once with the HSM"""
+        try:
+            audit_key = AESGCM.generate_key(bit_length=256)
+            wrapped_key = self.hsm.encrypt_data(audit_key, self._hsm_public_key)
+            
+            # Swap as one tuple so concurrent batch writers see a consistent key
+            self._audit_key = (AESGCM(audit_key), len(wrapped_key).to_bytes(2, "big") + wrapped_key)
+            self._audit_key_rotate_at = time.monotonic() + self.audit_key_rotation_seconds
+        except Exception as e:
+            self.logger.error(f"Audit key rotation failed: {str(e)}")
+            raise NetworkSecurityError(f"Failed to rotate audit key: {str(e)}")
+    
+    def _write_audit_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Encrypt a batch of audit records under the local audit key and store it"""
+        if time.monotonic() >= self._audit_key_rotate_at:
+            self._rotate_audit_key()
+        
+        # Seal locally; prefix the HSM-wrapped key so operators can unwrap it
+        audit_aead, wrapped_key = self._audit_key
+        nonce = os.urandom(12)
+        encrypted_audit = wrapped_key + nonce + audit_aead.encrypt(
+            nonce, serialization.dumps(batch), None
+        )
+        
+        # Store in secure audit log
+        self._store_secure_audit(encrypted_audit)
+        
+        self.logger.info(f"Secure audit log batch of {len(batch)} records created successfully")
+    
     def _store_secure_audit(self, encrypted_audit: bytes) -> None:
         """Store encrypted audit log securely"""
         try:
             # In production, use secure audit storage
             # For simulation, we use HSM storage
-            self.hsm._store_key_in_hsm(encrypted_audit)
+            self.hsm.store_audit_record(encrypted_audit)
         except Exception as e:
             self.logger.error(f"Audit storage failed: {str(e)}")
             raise NetworkSecurityError(f"Failed to store audit log: {str(e)}")
     
-    def validate_network_access(self, request: Dict[str, Any]) -> bool:
-        """Validate network access with strict security checks"""
-        try:
-            # Get client information
-            client_ip = request.get("client_ip", "")
-            client_port = request.get("client_port", 0)
-            
-            # IP address validation
-            if not self._validate_ip(client_ip):
-                raise NetworkSecurityError("Invalid IP address")
-            
-            # IP whitelist/blacklist check
-            if not self._check_ip_policy(client_ip):
-                raise NetworkSecurityError("IP access denied")
-            
-            # Rate limiting
-            if not self._check_rate_limit(client_ip):
-                raise NetworkSecurityError("Rate limit exceeded")
-            
-            # Protocol validation
-            if not self._validate_protocol(request):
-                raise NetworkSecurityError("Invalid protocol")
-            
-            # Packet inspection
-            if not self._inspect_packet(request):
-                raise NetworkSecurityError("Malformed packet")
-            
-            # Connection state validation
-            if not self._validate_connection_state(client_ip, client_port):
-                raise NetworkSecurityError("Invalid connection state")
-            
-            return True
-        except NetworkSecurityError as e:
-            self.logger.error(f"Network access denied: {str(e)}")
-            raise
-        except Exception as e:
-            self.logger.error(f"Network security error: {str(e)}")
-            raise NetworkSecurityError(f"Network security error: {str(e)}")
-    
     def _validate_ip(self, ip: str) -> bool:
         """Validate IP address format"""
-        try:
-            ipaddress.ip_address(ip)
-            return True
-        except ValueError:
+        return _is_valid_ip(ip)
+    
+    @staticmethod
+    def _compile_ip_policy(entries: Iterable[str]) -> Tuple[frozenset, Tuple[Tuple[int, int, frozenset], ...]]:
+        """Split IP policy entries into exact addresses and CIDR lookup tables"""
+        addresses = set()
+        networks: Dict[Tuple[int, int], set] = {}
+        
+        for entry in entries:
+            if "/" not in entry:
+                addresses.add(entry)
+                continue
+            network = ipaddress.ip_network(entry, strict=False)
+            shift = network.max_prefixlen - network.prefixlen
+            networks.setdefault((network.version, shift), set()).add(
+                int(network.network_address) >> shift
+            )
+        
+        return frozenset(addresses), tuple(
+            (version, shift, frozenset(prefixes))
+            for (version, shift), prefixes in networks.items()
+        )
+    
+    @staticmethod
+    def _in_networks(ip: str, networks: Tuple[Tuple[int, int, frozenset], ...]) -> bool:
+        """Check whether an IP falls inside any compiled CIDR range"""
+        if not networks:
             return False
+        address = ipaddress.ip_address(ip)
+        value = int(address)
+        for version, shift, prefixes in networks:
+            if address.version == version and value >> shift in prefixes:
+                return True
+        return False
     
     def _check_ip_policy(self, ip: str) -> bool:
         """Check IP against whitelist/blacklist"""
         try:
             # Check blocked IPs
-            if ip in self.blocked_ips:
+            if ip in self.blocked_ips or self._in_networks(ip, self._blocked_networks):
                 return False
             
             # Check allowed IPs
-            if self.allowed_ips and ip not in self.allowed_ips:
-                return False
+            if self.allowed_ips or self._allowed_networks:
+                if ip not in self.allowed_ips and not self._in_networks(ip, self._allowed_networks):
+                    return False
             
             return True
         except Exception as e:
@@ -540,25 +700,23 @@ class NetworkSecurity:
     def _check_rate_limit(self, ip: str) -> bool:
         """Check and enforce rate limits"""
         try:
-            current_time = datetime.now()
+            now_ns = time.monotonic_ns()
             
-            # Initialize rate limit state
-            if ip not in self.rate_limit_state:
-                self.rate_limit_state[ip] = {
-                    "requests": 0,
-                    "last_reset": current_time
-                }
-            
-            state = self.rate_limit_state[ip]
+            # Look up or allocate the IP's slot
+            slot = self._rate_index.get(ip)
+            if slot is None:
+                slot = self._allocate_rate_slot(ip, now_ns)
+            else:
+                self._rate_index.move_to_end(ip)
             
             # Reset counter if time window has passed
-            if (current_time - state["last_reset"]).total_seconds() > self.rate_limits["time_window_seconds"]:
-                state["requests"] = 0
-                state["last_reset"] = current_time
+            if now_ns - int(self._rate_reset_ns[slot]) > self._rate_window_ns:
+                self._rate_counts[slot] = 0
+                self._rate_reset_ns[slot] = now_ns
             
             # Check request count
-            state["requests"] += 1
-            if state["requests"] > self.rate_limits["max_requests"]:
+            self._rate_counts[slot] += 1
+            if self._rate_counts[slot] > self.rate_limits["max_requests"]:
                 return False
             
             return True
@@ -566,18 +724,31 @@ class NetworkSecurity:
             self.logger.error(f"Rate limit check failed: {str(e)}")
             raise NetworkSecurityError(f"Rate limit check failed: {str(e)}")
     
+    def _allocate_rate_slot(self, ip: str, now_ns: int) -> int:
+        """Assign a rate limit slot to a new IP, recycling the LRU slot when full"""
+        if len(self._rate_index) >= self.max_rate_limit_states:
+            _, slot = self._rate_index.popitem(last=False)
+        else:
+            slot = len(self._rate_index)
+            if slot >= len(self._rate_counts):
+                grow = min(len(self._rate_counts), self.max_rate_limit_states - len(self._rate_counts))
+                self._rate_counts = np.concatenate((self._rate_counts, np.zeros(grow, dtype=np.uint32)))
+                self._rate_reset_ns = np.concatenate((self._rate_reset_ns, np.zeros(grow, dtype=np.int64)))
+        
+        self._rate_index[ip] = slot
+        self._rate_counts[slot] = 0
+        self._rate_reset_ns[slot] = now_ns
+        return slot
+    
     def _validate_protocol(self, request: Dict[str, Any]) -> bool:
         """Validate network protocol"""
         try:
-            protocol = request.get("protocol", "")
-            allowed_protocols = ["HTTPS", "TLS"]
-            
-            if protocol not in allowed_protocols:
+            protocol = request.get("protocol")
+            if protocol not in self._ALLOWED_PROTOCOLS:
                 return False
             
             # Validate protocol version
-            version = request.get("protocol_version", "")
-            if protocol == "TLS" and version != "1.3":
+            if protocol == "TLS" and request.get("protocol_version") != "1.3":
                 return False
             
             return True
@@ -585,47 +756,59 @@ class NetworkSecurity:
             self.logger.error(f"Protocol validation failed: {str(e)}")
             raise NetworkSecurityError(f"Protocol validation failed: {str(e)}")
     
-    def _inspect_packet(self, request: Dict[str, Any]) -> bool:
+    @staticmethod
+    def _serialize_request(request: Dict[str, Any]) -> bytes:
+        """Serialize a request for inspection, excluding its own HMAC field"""
+        # Canonical encoding so the HMAC input is the same with or without orjson
+        return serialization.canonical_dumps({k: v for k, v in request.items() if k != "hmac"})
+    
+    def _inspect_packet(self, request: Dict[str, Any], *, serialized: bytes) -> bool:
         """Inspect network packet for security"""
         try:
             # Check packet size
-            if len(str(request)) > self.config.get("max_packet_size", 1024):
+            if len(serialized) > self.config.get("max_packet_size", 1024):
                 return False
             
-            # Check for malicious patterns
-            malicious_patterns = [
-                "DROP TABLE",
-                "DELETE FROM",
-                "SELECT * FROM",
-                "UNION SELECT"
-            ]
-            
-            for pattern in malicious_patterns:
-                if pattern in str(request):
+            # Validate structured fields by type and shape
+            for field, value in request.items():
+                expected = REQUEST_FIELD_TYPES.get(field)
+                if expected is None:
+                    # Unknown field: scan its name as well as its content
+                    if MALICIOUS_PATTERNS.search(str(field)):
+                        return False
+                    text = value if isinstance(value, str) else serialization.dumps(value).decode()
+                    if MALICIOUS_PATTERNS.search(text):
+                        return False
+                elif value is None:
+                    continue
+                elif not isinstance(value, expected) or isinstance(value, bool):
+                    return False
+                elif isinstance(value, str) and not STRUCTURED_TOKEN.fullmatch(value):
                     return False
-            
-            # Check packet integrity
-            if not self._verify_packet_integrity(request):
-                return False
             
             return True
         except Exception as e:
             self.logger.error(f"Packet inspection failed: {str(e)}")
             raise NetworkSecurityError(f"Packet inspection failed: {str(e)}")
     
-    def _verify_packet_integrity(self, request: Dict[str, Any]) -> bool:
+    def _verify_packet_integrity(self, request: Dict[str, Any], *, serialized: bytes) -> bool:
         """Verify packet integrity using HMAC"""
         try:
-            # Generate HMAC
-            message = str(request)
-            key = self.config["packet_integrity_key"]
+            if self._packet_hmac is None:
+                raise NetworkSecurityError("Packet integrity key not configured")
+            
+            # Generate HMAC-SHA256 from the precomputed keyed state
+            mac = self._packet_hmac.copy()
+            mac.update(serialized)
+            expected = mac.hexdigest().encode()
             
-            hmac = hashlib.sha256()
-            hmac.update(key.encode())
-            hmac.update(message.encode())
+            # The hex digest may arrive as str or bytes; compare both as bytes
+            received = request.get("hmac") or b""
+            if isinstance(received, str):
+                received = received.encode()
             
-            # Verify HMAC
-            if request.get("hmac") != hmac.hexdigest():
+            # Verify HMAC in constant time
+            if not hmac.compare_digest(received, expected):
                 return False
             
             return True
@@ -633,6 +816,13 @@ class NetworkSecurity:
             self.logger.error(f"Packet integrity check failed: {str(e)}")
             raise NetworkSecurityError(f"Packet integrity check failed: {str(e)}")
     
+    @staticmethod
+    def _touch_lru(cache: OrderedDict, key: Any, max_size: int) -> None:
+        """Mark an entry as most recently used and evict the oldest beyond capacity"""
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+    
     def _validate_connection_state(self, ip: str, port: int) -> bool:
         """Validate connection state"""
         try:
@@ -647,6 +837,7 @@ class NetworkSecurity:
                 }
             
             state = self.connection_state[connection_key]
+            self._touch_lru(self.connection_state, connection_key, self.max_connection_states)
             
             # Check connection attempts
             if state["attempts"] >= self.config.get("max_connection_attempts", 3):
@@ -4,14 +4,39 @@ Rate Limiter System
 This module implements enterprise-grade rate limiting for security events.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Deque, List, Tuple
+import array
+from collections import deque
+import contextlib
+import heapq
+import itertools
 import logging
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import timedelta
 import threading
+import time
+import weakref
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Reserved key hashes marking never-used and evicted bucket slots
+EMPTY_SLOT = 0
+TOMBSTONE_SLOT = 1
+
+# The bucket table is split into segments, each guarded by its own lock;
+# a key probes only within its segment
+LOCK_STRIPES = 64
+MIN_SEGMENT_SIZE = 8
+
+# Highest fraction of slots max_buckets may occupy; keeps probe chains short
+MAX_LOAD_FACTOR = 0.66
+
+# Expired buckets evicted from a segment's TTL queue per insert
+EVICTIONS_PER_INSERT = 2
+
+# Longest the shared cleanup thread sleeps before rechecking its schedule
+JANITOR_MAX_SLEEP_SECONDS = 60
+
 class RateLimiterError(Exception):
     """Raised when rate limiting operations fail"""
     pass
@@ -37,17 +62,41 @@ class RateLimiter:
         self.rate_limits = config.get("rate_limits", {})
         self.cleanup_interval = timedelta(seconds=config.get("cleanup_interval_seconds", 3600))
         self.max_buckets = config.get("max_buckets", 10000)
+        self._cleanup_ns = int(self.cleanup_interval.total_seconds() * 1_000_000_000)
+        
+        # Limits compiled to (window_ns, max_requests) per action
+        self._limits: Dict[str, Tuple[int, int]] = {}
+        self._compile_limits(self.rate_limits)
         
-        # Rate limit tracking
-        self.buckets: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-            "count": 0,
-            "last_reset": datetime.utcnow(),
-            "lock": threading.Lock()
-        })
+        # Rate limit tracking: open-addressed structure-of-arrays bucket table,
+        # sized once to the power of two that keeps max_buckets under the load factor
+        segment_size = MIN_SEGMENT_SIZE
+        while segment_size * LOCK_STRIPES * MAX_LOAD_FACTOR < self.max_buckets:
+            segment_size *= 2
+        self._segment_size = segment_size
+        capacity = segment_size * LOCK_STRIPES
+        # Columns are array.array so per-slot reads return plain ints; NumPy
+        # views over the same memory serve whole-table operations
+        self._key_hash = array.array("Q", bytes(8 * capacity))
+        self._count = array.array("I", bytes(4 * capacity))
+        self._prev_count = array.array("I", bytes(4 * capacity))
+        self._last_reset = array.array("q", bytes(8 * capacity))
+        # Each bucket's window length; a bucket may only be evicted once both
+        # its current and previous windows have lapsed
+        self._window = array.array("q", bytes(8 * capacity))
+        self._key_hash_np = np.frombuffer(self._key_hash, dtype=np.uint64)
+        self._last_reset_np = np.frombuffer(self._last_reset, dtype=np.int64)
+        self._window_np = np.frombuffer(self._window, dtype=np.int64)
+        self._locks = tuple(threading.Lock() for _ in range(LOCK_STRIPES))
         
-        # Cleanup thread
-        self.cleanup_thread = threading.Thread(target=self._cleanup_buckets, daemon=True)
-        self.cleanup_thread.start()
+        # Per-segment TTL queues of (enqueued_ns, slot, key_hash). Every bucket
+        # shares one TTL, so insertion order is expiry order.
+        self._ttl_queues: Tuple[Deque[Tuple[int, int, int]], ...] = tuple(
+            deque() for _ in range(LOCK_STRIPES)
+        )
+        
+        # The shared cleanup thread enforces max_buckets; expiry happens on insert
+        _janitor.register(self)
         
     def initialize_limits(self, limits: Dict[str, Any]) -> None:
         """
@@ -62,12 +111,29 @@ class RateLimiter:
                     }
                 }
         """
+        self._compile_limits({**self.rate_limits, **limits})
         self.rate_limits.update(limits)
+    
+    def _compile_limits(self, rate_limits: Dict[str, Any]) -> None:
+        """Precompute each action's window in nanoseconds and its request cap"""
+        compiled = {
+            action: (int(limit_config["window_seconds"] * 1_000_000_000), limit_config["max_requests"])
+            for action, limit_config in rate_limits.items()
+            if limit_config
+        }
+        for action, (window_ns, _) in compiled.items():
+            if window_ns <= 0:
+                raise RateLimiterError(f"Rate limit window for {action} must be positive")
+        self._limits = compiled
         
     def check_limit(self, action: str, identifier: str) -> bool:
         """
         Check if an action is allowed based on rate limits.
         
+        Uses a sliding window counter: the previous window's count is
+        weighted by how much of it still overlaps the sliding window, so
+        clients cannot burst across a fixed window boundary.
+        
         Args:
             action: The action being performed
             identifier: Unique identifier for rate limiting (e.g., user_id, ip_address)
@@ -79,75 +145,267 @@ class RateLimiter:
             RateLimiterError: If rate limit configuration is invalid
         """
         try:
-            # Get or create bucket
-            bucket_key = f"{action}:{identifier}"
-            bucket = self.buckets[bucket_key]
+            # Get rate limit configuration
+            limit = self._limits.get(action)
+            if limit is None:
+                return True  # No limit configured
+                
+            window_ns, max_requests = limit
+            
+            key_hash = self._hash_key((action, identifier))
+            now = time.monotonic_ns()
             
-            with bucket["lock"]:
-                # Get rate limit configuration
-                limit_config = self.rate_limits.get(action)
-                if not limit_config:
-                    return True  # No limit configured
+            segment = key_hash % LOCK_STRIPES
+            with self._locks[segment]:
+                slot = self._find_slot(key_hash, now)
+                if slot is None:
+                    # Every bucket in the segment is still enforcing a limit;
+                    # evicting one would reset it, so fail closed
+                    logger.warning(f"Rate limit table segment full, denying {action}")
+                    return False
+                if self._key_hash[slot] != key_hash:
+                    # New bucket
+                    self._expire_buckets(segment, now)
+                    self._key_hash[slot] = key_hash
+                    self._prev_count[slot] = 0
+                    self._last_reset[slot] = now
+                    self._window[slot] = window_ns
+                    self._ttl_queues[segment].append((now, slot, key_hash))
+                    count = 0
+                    prev_count = 0
+                    elapsed = 0
+                else:
+                    count = self._count[slot]
+                    prev_count = self._prev_count[slot]
+                    elapsed = now - self._last_reset[slot]
+                    
+                # Roll the window forward, keeping the last full window's count
+                if elapsed >= window_ns:
+                    prev_count = count if elapsed < 2 * window_ns else 0
+                    count = 0
+                    self._prev_count[slot] = prev_count
+                    self._last_reset[slot] += (elapsed // window_ns) * window_ns
+                    elapsed %= window_ns
                     
-                window = timedelta(seconds=limit_config["window_seconds"])
-                max_requests = limit_config["max_requests"]
-                
-                # Check if window has expired
-                current_time = datetime.utcnow()
-                if current_time - bucket["last_reset"] > window:
-                    bucket["count"] = 0
-                    bucket["last_reset"] = current_time
-                
                 # Check if limit is exceeded
-                if bucket["count"] >= max_requests:
+                if count + prev_count * (window_ns - elapsed) // window_ns >= max_requests:
+                    self._count[slot] = count
                     return False
-                
+                    
                 # Increment counter
-                bucket["count"] += 1
+                self._count[slot] = count + 1
                 return True
                 
         except Exception as e:
             logger.error(f"Rate limit check failed: {str(e)}")
             raise RateLimiterError(f"Failed to check rate limit: {str(e)}")
-    
-    def _cleanup_buckets(self) -> None:
-        """Periodically clean up old rate limit buckets."""
-        while True:
-            try:
-                current_time = datetime.utcnow()
+            
+    @staticmethod
+    def _hash_key(bucket_key: Tuple[str, str]) -> int:
+        """Map a bucket key to a 64-bit hash that avoids the reserved slot markers"""
+        key_hash = hash(bucket_key) & 0xFFFFFFFFFFFFFFFF
+        return key_hash if key_hash > TOMBSTONE_SLOT else key_hash + 2
+        
+    def _find_slot(self, key_hash: int, now: int) -> Optional[int]:
+        """
+        Locate the slot for a key within its segment; caller must hold the segment lock.
+        
+        Returns the key's slot if present, otherwise the first reusable slot on its
+        probe path, or None if the segment holds only live buckets.
+        """
+        size = self._segment_size
+        base = (key_hash % LOCK_STRIPES) * size
+        home = (key_hash // LOCK_STRIPES) & (size - 1)
+        free = None
+        
+        for i in range(size):
+            slot = base + ((home + i) & (size - 1))
+            slot_hash = self._key_hash[slot]
+            if slot_hash == key_hash:
+                return slot
+            if slot_hash == EMPTY_SLOT:
+                return slot if free is None else free
+            if free is None and (slot_hash == TOMBSTONE_SLOT or self._is_stale(slot, now)):
+                free = slot
                 
-                # Clean up expired buckets
-                for bucket_key, bucket in list(self.buckets.items()):
-                    with bucket["lock"]:
-                        if current_time - bucket["last_reset"] > self.cleanup_interval:
-                            del self.buckets[bucket_key]
+        if free is None:
+            # Segment is full: ask for an early max_buckets trim
+            _janitor.request_cleanup(self)
+        return free
+        
+    def _is_stale(self, slot: int, now: int) -> bool:
+        """Whether a bucket is past the cleanup interval and no longer limits anything"""
+        idle = now - self._last_reset[slot]
+        return idle > self._cleanup_ns and idle >= 2 * self._window[slot]
+        
+    def _expire_buckets(self, segment: int, now: int) -> None:
+        """Evict a bounded number of expired buckets; caller must hold the segment lock"""
+        queue = self._ttl_queues[segment]
+        stale_before = now - self._cleanup_ns
+        
+        for _ in range(EVICTIONS_PER_INSERT):
+            if not queue or queue[0][0] >= stale_before:
+                return
+            _, slot, key_hash = queue.popleft()
+            if self._key_hash[slot] != key_hash:
+                continue  # Slot was evicted or reused since it was queued
                 
-                # Clean up if we exceed max buckets
-                if len(self.buckets) > self.max_buckets:
-                    oldest_buckets = sorted(
-                        self.buckets.items(),
-                        key=lambda x: x[1]["last_reset"]
-                    )
-                    for bucket_key, _ in oldest_buckets[:len(self.buckets) - self.max_buckets]:
-                        del self.buckets[bucket_key]
+            if self._is_stale(slot, now):
+                self._release_slot(slot)
+            else:
+                # Still active: requeue for when it can next become stale
+                window = self._window[slot]
+                queue.append((self._last_reset[slot] + max(0, 2 * window - self._cleanup_ns), slot, key_hash))
                 
-                # Sleep until next cleanup
-                time.sleep(self.cleanup_interval.total_seconds())
+    def _release_slot(self, slot: int) -> None:
+        """
+        Evict the bucket in a slot; caller must hold the segment lock.
+        
+        The slot becomes a tombstone so later keys on its probe path stay
+        reachable. If the next slot is empty no probe can pass beyond it, so
+        this slot and the tombstones leading up to it revert to empty and
+        lookups stop early again.
+        """
+        size = self._segment_size
+        base = slot - slot % size
+        self._key_hash[slot] = TOMBSTONE_SLOT
+        if self._key_hash[base + ((slot + 1) & (size - 1))] != EMPTY_SLOT:
+            return
+        while self._key_hash[slot] == TOMBSTONE_SLOT:
+            self._key_hash[slot] = EMPTY_SLOT
+            slot = base + ((slot - 1) & (size - 1))
+            
+    @contextlib.contextmanager
+    def _all_segments(self):
+        """Hold every segment lock for a whole-table operation"""
+        with contextlib.ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
+            
+    def _cleanup_buckets(self) -> None:
+        """Clean up old rate limit buckets; run periodically by the shared cleanup thread."""
+        with self._all_segments():
+            # Clean up if we exceed max buckets, evicting only buckets whose
+            # windows have lapsed so no client's limit is reset early
+            occupied = self._key_hash_np > TOMBSTONE_SLOT
+            excess = int(np.count_nonzero(occupied)) - self.max_buckets
+            if excess > 0:
+                idle = time.monotonic_ns() - self._last_reset_np
+                lapsed = np.flatnonzero(occupied & (idle >= 2 * self._window_np))
+                excess = min(excess, len(lapsed))
+                if excess > 0:
+                    oldest = np.argpartition(self._last_reset_np[lapsed], excess - 1)[:excess]
+                    for slot in lapsed[oldest].tolist():
+                        self._release_slot(slot)
                 
-            except Exception as e:
-                logger.error(f"Rate limiter cleanup failed: {str(e)}")
-                time.sleep(60)  # Wait before retrying
-    
+    def close(self) -> None:
+        """Stop periodic cleanup for this rate limiter."""
+        _janitor.unregister(self)
+        
     def get_metrics(self) -> Dict[str, Any]:
         """Get current rate limiting metrics."""
+        # One clock read covers every bucket
+        active_since = time.monotonic_ns() - self._cleanup_ns
+        occupied = self._key_hash_np > TOMBSTONE_SLOT
         metrics = {
-            "total_buckets": len(self.buckets),
-            "active_buckets": sum(
-                1 for bucket in self.buckets.values() 
-                if datetime.utcnow() - bucket["last_reset"] < self.cleanup_interval
-            ),
+            "total_buckets": int(np.count_nonzero(occupied)),
+            "active_buckets": int(np.count_nonzero(occupied & (self._last_reset_np > active_since))),
             "rate_limits": self.rate_limits,
             "cleanup_interval": self.cleanup_interval.total_seconds(),
             "max_buckets": self.max_buckets
         }
         return metrics
+        
+
+class _Janitor:
+    """
+    Single daemon thread that runs bucket cleanup for every rate limiter.
+    
+    Limiters are held weakly and scheduled on a heap by their next cleanup
+    time, so idle limiters cost no thread of their own. The thread sleeps on
+    an event so new registrations and cleanup requests wake it early, and it
+    exits once no limiters remain.
+    """
+    
+    def __init__(self):
+        self._schedule: List[Tuple[float, int, weakref.ref]] = []
+        self._due: "weakref.WeakKeyDictionary[RateLimiter, float]" = weakref.WeakKeyDictionary()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+    def register(self, limiter: "RateLimiter") -> None:
+        """Schedule periodic cleanup for a rate limiter"""
+        self._schedule_cleanup(limiter, limiter.cleanup_interval.total_seconds())
+        
+    def unregister(self, limiter: "RateLimiter") -> None:
+        """Stop running cleanup for a rate limiter"""
+        with self._lock:
+            self._due.pop(limiter, None)
+        self._wakeup.set()
+        
+    def request_cleanup(self, limiter: "RateLimiter") -> None:
+        """Run a registered limiter's cleanup as soon as possible"""
+        with self._lock:
+            if limiter not in self._due:
+                return
+        self._schedule_cleanup(limiter, 0)
+        
+    def _schedule_cleanup(self, limiter: "RateLimiter", delay: float) -> None:
+        """Set a limiter's next cleanup time, superseding any earlier entry"""
+        with self._lock:
+            due = time.monotonic() + delay
+            self._due[limiter] = due
+            heapq.heappush(self._schedule, (due, next(self._sequence), weakref.ref(limiter)))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rate-limiter-cleanup", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        
+    def _run(self) -> None:
+        """Run due cleanups in schedule order"""
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                # Drop entries for collected, unregistered or rescheduled limiters
+                limiter = None
+                while self._schedule:
+                    limiter = self._schedule[0][2]()
+                    if limiter is not None and self._due.get(limiter) == self._schedule[0][0]:
+                        break
+                    heapq.heappop(self._schedule)
+                del limiter
+                
+                if not self._schedule:
+                    self._thread = None
+                    return
+                    
+                wait = self._schedule[0][0] - time.monotonic()
+                if wait <= 0:
+                    ref = heapq.heappop(self._schedule)[2]
+                    
+            if wait > 0:
+                self._wakeup.wait(min(wait, JANITOR_MAX_SLEEP_SECONDS))
+                continue
+                
+            limiter = ref()
+            if limiter is None:
+                continue  # Limiter was garbage collected
+                
+            delay = limiter.cleanup_interval.total_seconds()
+            try:
+                limiter._cleanup_buckets()
+            except Exception as e:
+                logger.error(f"Rate limiter cleanup failed: {str(e)}")
+                delay = min(delay, 60)  # Retry sooner after a failure
+                
+            with self._lock:
+                if limiter in self._due:
+                    due = time.monotonic() + delay
+                    self._due[limiter] = due
+                    heapq.heappush(self._schedule, (due, next(self._sequence), ref))
+            del limiter
+
+_janitor = _Janitor()
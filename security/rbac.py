@@ -5,7 +5,8 @@ This module implements enterprise-grade RBAC following NIST SP 800-53 and ISO 27
 """
 
 import logging
-from typing import Dict, Set, List, Optional, Type
+from typing import Dict, Set, List, Optional, Type, Any, Iterable
+from datetime import datetime
 from enum import Enum
 from dataclasses import dataclass
 from security.audit_trail import AuditTrail
@@ -27,24 +28,42 @@ class Permission(Enum):
     @classmethod
     def get_risk_level(cls, permission: 'Permission') -> str:
         """Get risk level for permission"""
-        high_risk = {
-            Permission.ACCESS_SENSITIVE_DATA,
-            Permission.OVERRIDE_RULES,
-            Permission.MANAGE_POLICIES,
-            Permission.CONFIGURE_SYSTEM
-        }
-        
-        medium_risk = {
-            Permission.MANAGE_USERS,
-            Permission.ACCESS_LOGS,
-            Permission.MONITOR_SYSTEM
-        }
-        
-        if permission in high_risk:
-            return "high"
-        elif permission in medium_risk:
-            return "medium"
-        return "low"
+        return _PERMISSION_RISK_LEVELS[permission]
+    
+    @classmethod
+    def to_mask(cls, permissions: Iterable['Permission']) -> int:
+        """Combine permissions into a bitmask"""
+        mask = 0
+        for permission in permissions:
+            mask |= permission.bit
+        return mask
+    
+    @classmethod
+    def from_mask(cls, mask: int) -> Set['Permission']:
+        """Expand a bitmask into the set of permissions it contains"""
+        return {permission for permission in cls if mask & permission.bit}
+
+# Assign each permission a bit so permission sets can be held as integer masks
+for _index, _permission in enumerate(Permission):
+    _permission.bit = 1 << _index
+
+_HIGH_RISK_PERMISSIONS = Permission.to_mask({
+    Permission.ACCESS_SENSITIVE_DATA,
+    Permission.OVERRIDE_RULES,
+    Permission.MANAGE_POLICIES,
+    Permission.CONFIGURE_SYSTEM
+})
+_MEDIUM_RISK_PERMISSIONS = Permission.to_mask({
+    Permission.MANAGE_USERS,
+    Permission.ACCESS_LOGS,
+    Permission.MONITOR_SYSTEM
+})
+_PERMISSION_RISK_LEVELS = {
+    permission: "high" if permission.bit & _HIGH_RISK_PERMISSIONS
+    else "medium" if permission.bit & _MEDIUM_RISK_PERMISSIONS
+    else "low"
+    for permission in Permission
+}
 
 class Role(Enum):
     """Security roles following ISO 27001 role-based access control"""
@@ -58,14 +77,16 @@ class Role(Enum):
     @property
     def risk_level(self) -> str:
         """Get risk level for role"""
-        high_risk = {Role.SUPER_ADMIN, Role.SECURITY_ADMIN}
-        medium_risk = {Role.ADMIN, Role.AUDITOR}
-        
-        if self in high_risk:
-            return "high"
-        elif self in medium_risk:
-            return "medium"
-        return "low"
+        return _ROLE_RISK_LEVELS[self]
+
+_HIGH_RISK_ROLES = frozenset({Role.SUPER_ADMIN, Role.SECURITY_ADMIN})
+_MEDIUM_RISK_ROLES = frozenset({Role.ADMIN, Role.AUDITOR})
+_ROLE_RISK_LEVELS = {
+    role: "high" if role in _HIGH_RISK_ROLES
+    else "medium" if role in _MEDIUM_RISK_ROLES
+    else "low"
+    for role in Role
+}
 
 class AccessControlError(Exception):
     """Raised when access control operations fail"""
@@ -76,15 +97,20 @@ class UserContext:
     """User context for access control decisions"""
     user_id: str
     role: Role
-    permissions: Set[Permission]
+    permissions_mask: int
     risk_level: str
     last_access: datetime
     ip_address: str
     user_agent: str
     
+    @property
+    def permissions(self) -> Set[Permission]:
+        """Permissions granted to the user"""
+        return Permission.from_mask(self.permissions_mask)
+    
     def has_permission(self, permission: Permission) -> bool:
         """Check if user has permission"""
-        return permission in self.permissions
+        return bool(self.permissions_mask & permission.bit)
 
 class RBAC:
     """
@@ -117,6 +143,9 @@ class RBAC:
         # Initialize user sessions
         self.user_sessions: Dict[str, UserContext] = {}
         
+        # Sessions per risk level, maintained as sessions are added and removed
+        self._risk_counts: Dict[str, int] = {"low": 0, "medium": 0, "high": 0}
+        
     def authenticate(self, user_id: str, role: Role, context: Dict[str, Any]) -> UserContext:
         """
         Authenticate user and create session context.
@@ -137,13 +166,13 @@ class RBAC:
             risk_level = self.risk_assessment.evaluate_session(user_id, context)
             
             # Get role permissions
-            permissions = self.roles[role]
+            permissions_mask = self.roles[role]
             
             # Create user context
             user_context = UserContext(
                 user_id=user_id,
                 role=role,
-                permissions=permissions,
+                permissions_mask=permissions_mask,
                 risk_level=risk_level,
                 last_access=datetime.utcnow(),
                 ip_address=context.get("ip_address", "unknown"),
@@ -151,7 +180,11 @@ class RBAC:
             )
             
             # Store session
+            previous = self.user_sessions.get(user_id)
+            if previous is not None:
+                self._risk_counts[previous.risk_level] -= 1
             self.user_sessions[user_id] = user_context
+            self._risk_counts[risk_level] = self._risk_counts.get(risk_level, 0) + 1
             
             # Log authentication
             self.audit.log_event("authentication", {
@@ -167,6 +200,17 @@ class RBAC:
             self.logger.error(f"Authentication failed: {str(e)}")
             raise AccessControlError(f"Failed to authenticate user: {str(e)}")
     
+    def logout(self, user_id: str) -> None:
+        """
+        End a user's session.
+        
+        Args:
+            user_id: User identifier
+        """
+        user_context = self.user_sessions.pop(user_id, None)
+        if user_context is not None:
+            self._risk_counts[user_context.risk_level] -= 1
+    
     def check_permission(self, user_id: str, permission: Permission) -> bool:
         """
         Check if user has permission.
@@ -184,9 +228,9 @@ class RBAC:
         user_context = self.user_sessions[user_id]
         return user_context.has_permission(permission)
     
-    def _initialize_roles(self) -> Dict[Role, Set[Permission]]:
-        """Initialize role-to-permission mapping."""
-        return {
+    def _initialize_roles(self) -> Dict[Role, int]:
+        """Initialize role-to-permission mapping as permission bitmasks."""
+        roles = {
             Role.ANALYST: {
                 Permission.VIEW_TRANSACTIONS,
                 Permission.FLAG_TRANSACTIONS
@@ -216,6 +260,7 @@ class RBAC:
                 Permission.MONITOR_SYSTEM
             }
         }
+        return {role: Permission.to_mask(permissions) for role, permissions in roles.items()}
     
     def _initialize_permission_hierarchy(self) -> Dict[Permission, Set[Permission]]:
         """Initialize permission hierarchy."""
@@ -245,7 +290,7 @@ class RBAC:
     
     def get_role_permissions(self, role: Role) -> Set[Permission]:
         """Get all permissions for a role."""
-        return self.roles[role]
+        return Permission.from_mask(self.roles[role])
     
     def get_user_permissions(self, user_id: str) -> Set[Permission]:
         """Get all permissions for a user."""
@@ -265,58 +310,23 @@ class RBAC:
             "active_users": len(self.user_sessions),
             "roles": len(self.roles),
             "permissions": len(Permission),
-            "high_risk_users": len([u for u in self.user_sessions.values() 
-                                  if u.risk_level == "high"]),
-            "medium_risk_users": len([u for u in self.user_sessions.values() 
-                                    if u.risk_level == "medium"])
+            "high_risk_users": self._risk_counts["high"],
+            "medium_risk_users": self._risk_counts["medium"]
         }
         return metrics
-
-    def __init__(self, config: Dict[str, Any]):
-        """Initialize RBAC system"""
-        self.config = config
-        self.logger = logging.getLogger(__name__)
-        
-        # Security parameters
-        self.users: Dict[str, Role] = {}
-        self.permissions: Dict[str, Set[Permission]] = {}
-        self.roles: Dict[str, Set[Permission]] = {
-            "admin": {"read", "write", "delete", "admin"},
-            "user": {"read", "write"},
-            "guest": {"read"}
-        }
-        self.role_hierarchy: Dict[str, List[str]] = {
-            "admin": ["user", "guest"],
-            "user": ["guest"]
-        }
-    
-    def add_user(self, user_id: str, role: Role) -> None:
-        """Add user with specified role"""
-        if role not in self.roles:
-            raise ValueError(f"Invalid role: {role}")
-        self.users[user_id] = role
-        self.permissions[user_id] = self.roles[role]
-    
-    def remove_user(self, user_id: str) -> None:
-        """Remove user from system"""
-        if user_id in self.users:
-            del self.users[user_id]
-            del self.permissions[user_id]
     
     def verify_permission(self, user_id: str, permission: Permission) -> bool:
         """Verify if user has permission"""
-        if user_id not in self.permissions:
+        user_context = self.user_sessions.get(user_id)
+        if user_context is None:
             raise AccessControlError(f"User {user_id} not found")
             
-        return permission in self.permissions[user_id]
-    
-    def get_user_permissions(self, user_id: str) -> Set[Permission]:
-        """Get all permissions for user"""
-        return self.permissions.get(user_id, set())
+        return user_context.has_permission(permission)
     
     def get_user_role(self, user_id: str) -> Optional[Role]:
         """Get user's role"""
-        return self.users.get(user_id)
+        user_context = self.user_sessions.get(user_id)
+        return user_context.role if user_context is not None else None
     
     def verify_transaction_access(self, user_id: str, transaction_id: str) -> bool:
         """Verify if user can access transaction"""
@@ -8,19 +8,112 @@ This module implements a secure session management system that:
 """
 
 import os
+import base64
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Deque, Tuple, Set
+from collections import OrderedDict, deque
 import secrets
 import hashlib
+import hmac
+import functools
+import threading
+import time
+import weakref
 from cryptography.fernet import Fernet
+from cryptography.hazmat.backends.openssl import backend as openssl_backend
+from core.env import is_production
+from security import serialization
 from security.key_management import SecureKeyManager
 from security.secrets_manager import SecretsManager
 from security.audit_trail import AuditTrail
+from security.audit_flusher import audit_flusher
 from security.risk_assessment import RiskAssessment
 
 logger = logging.getLogger(__name__)
 
+# rfernet produces standard Fernet tokens with the envelope built in Rust,
+# which is much cheaper for small session payloads
+try:
+    from rfernet import Fernet as _FernetBackend
+except ImportError:
+    _FernetBackend = Fernet
+    logger.debug("rfernet not installed, using cryptography Fernet for sessions")
+
+# Invalidated session entries kept for reuse by new sessions
+SESSION_POOL_SIZE = 1024
+
+# Audit events are queued and written by the shared background flusher every
+# AUDIT_FLUSH_INTERVAL seconds, or sooner once AUDIT_FLUSH_BATCH are pending.
+# Callers flush inline when AUDIT_QUEUE_SIZE events are pending, so events
+# are never dropped
+AUDIT_FLUSH_INTERVAL = 1.0
+AUDIT_FLUSH_BATCH = 256
+AUDIT_QUEUE_SIZE = 4096
+
+# Shortest period between sweeps for expired sessions; the sweeper otherwise
+# runs four times per session timeout
+SESSION_SWEEP_MIN_INTERVAL = 60
+
+# Default seconds before the biometric template is re-read from the secrets
+# manager, so a rotated template takes effect without a restart
+BIOMETRIC_TEMPLATE_TTL = 300
+
+# OPENSSL_ia32cap bit that advertises AES-NI to OpenSSL
+_IA32CAP_AESNI = 1 << 57
+
+@functools.lru_cache(maxsize=None)
+def _probe_aes_ni() -> Optional[bool]:
+    """
+    Check once whether OpenSSL can use AES-NI for session encryption.
+    
+    Returns:
+        True or False when known, None if the CPU flags cannot be read
+    """
+    # x86 lists CPU capabilities under "flags", ARM under "Features"
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            flags = next(
+                (line for line in cpuinfo if line.startswith(("flags", "Features"))), None
+            )
+    except OSError:
+        flags = None
+    if flags is None:
+        logger.info(f"Session encryption via {openssl_backend.openssl_version_text()}; "
+                    "AES-NI support unknown")
+        return None
+        
+    available = "aes" in flags.split()
+    
+    # OPENSSL_ia32cap can mask AES-NI out of OpenSSL even when the CPU has it
+    ia32cap = os.environ.get("OPENSSL_ia32cap", "").split(":")[0]
+    if available and ia32cap:
+        try:
+            if ia32cap.startswith("~"):
+                available = not int(ia32cap[1:], 0) & _IA32CAP_AESNI
+            else:
+                available = bool(int(ia32cap, 0) & _IA32CAP_AESNI)
+        except ValueError:
+            logger.warning(f"Ignoring malformed OPENSSL_ia32cap: {ia32cap}")
+            
+    if available:
+        logger.info(f"Session encryption via {openssl_backend.openssl_version_text()} with AES-NI")
+    else:
+        logger.warning(f"Session encryption via {openssl_backend.openssl_version_text()} "
+                       "without AES-NI; expect much slower AES")
+    return available
+
+def _run_session_sweeper(manager_ref: "weakref.ref[SecureSessionManager]",
+                         interval: float) -> None:
+    """Sweep a session manager's expired sessions until the manager is collected"""
+    while True:
+        time.sleep(interval)
+        manager = manager_ref()
+        if manager is None:
+            return
+        manager.sweep_expired_sessions()
+        del manager
+
 class SecureSessionError(Exception):
     """Raised when session operations fail"""
     pass
@@ -37,39 +130,134 @@ class SecureSessionManager:
                 - session_timeout_minutes: Session timeout in minutes
                 - biometric_timeout_minutes: Biometric timeout in minutes
                 - max_sessions_per_user: Maximum concurrent sessions
+                - max_total_sessions: Maximum sessions held across all users
+                - biometric_attempts_per_minute: Biometric attempts allowed per user
+                - biometric_template_ttl_seconds: Interval between biometric template reloads
         """
         self.config = config
         
+        # Refuse to run production sessions on a software-only AES path
+        if _probe_aes_ni() is False and is_production():
+            raise SecureSessionError("AES-NI is not available to OpenSSL")
+        
         # Initialize security components
         self.key_manager = SecureKeyManager(config)
         self.secrets_manager = SecretsManager()
         self.audit = AuditTrail(config)
         self.risk_assessment = RiskAssessment(config)
         
+        # Stored biometric template, kept only as a keyed 16-byte BLAKE2b hash
+        # and reloaded every biometric_template_ttl_seconds. Held as one
+        # (hash, expires) tuple so it is swapped atomically without the
+        # session lock; the hash is None if no template is configured
+        self._biometric_key = secrets.token_bytes(32)
+        self.biometric_template_ttl = config.get("biometric_template_ttl_seconds", BIOMETRIC_TEMPLATE_TTL)
+        self._load_biometric_template()
+        
         # Security parameters
         self.session_timeout = timedelta(minutes=config.get("session_timeout_minutes", 15))
         self.biometric_timeout = timedelta(minutes=config.get("biometric_timeout_minutes", 5))
+        self.session_timeout_seconds = self.session_timeout.total_seconds()
+        self.biometric_timeout_seconds = self.biometric_timeout.total_seconds()
         self.max_sessions = config.get("max_sessions_per_user", 5)
+        self.max_total_sessions = config.get("max_total_sessions", 10_000)
+        self.biometric_attempts = config.get("biometric_attempts_per_minute", 5)
+        
+        # Initialize session storage; session state is guarded by _lock.
+        # Sessions are kept in last_access order, least recent first
+        self._lock = threading.RLock()
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.user_sessions: Dict[str, Set[str]] = {}
+        
+        # Session IDs indexed by token hash, so lookups never scan sessions
+        self._hash_index: Dict[bytes, str] = {}
+        
+        # Biometric attempt token buckets per user, as (tokens, last refill);
+        # a bucket refills completely within a minute
+        self._rate_buckets: Dict[str, Tuple[float, float]] = {}
+        
+        # Free list of cleared session entries
+        self._session_pool: List[Dict[str, Any]] = []
+        
+        # Session cipher, rebuilt only when the derived session key changes
+        self._session_key: Optional[bytes] = None
+        self._session_fernet: Optional[Fernet] = None
+        
+        # Pending audit events, written by the shared background flusher
+        self._audit_queue: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        audit_flusher.register(self, AUDIT_FLUSH_INTERVAL)
         
-        # Initialize session storage
-        self.sessions: Dict[str, Dict[str, Any]] = {}
-        self.user_sessions: Dict[str, List[str]] = {}
+        # Expired sessions are removed in the background, not only when looked up
+        threading.Thread(
+            target=_run_session_sweeper,
+            args=(weakref.ref(self), max(SESSION_SWEEP_MIN_INTERVAL, self.session_timeout_seconds / 4)),
+            name="session-sweeper",
+            daemon=True
+        ).start()
         
     def _generate_session_id(self) -> str:
         """Generate a secure session ID"""
         return secrets.token_urlsafe(32)  # 256 bits of entropy
         
+    @staticmethod
+    def _token_hash(session_id: str) -> bytes:
+        """Compute the 16-byte BLAKE2b hash that indexes a session token"""
+        return hashlib.blake2b(session_id.encode(), digest_size=16).digest()
+        
+    def find_session(self, token_hash: bytes) -> Optional[str]:
+        """Look up a session ID by its token hash
+        
+        Args:
+            token_hash: BLAKE2b-128 hash of the session token
+            
+        Returns:
+            Session identifier if the hash belongs to a live session, None otherwise
+        """
+        return self._hash_index.get(token_hash)
+        
+    def _queue_audit(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Queue an audit event for the background flusher"""
+        self._audit_queue.append((event_type, data))
+        pending = len(self._audit_queue)
+        if pending >= AUDIT_QUEUE_SIZE:
+            self.flush_audit_log()
+        elif pending >= AUDIT_FLUSH_BATCH:
+            audit_flusher.request_flush(self)
+            
+    def flush_audit_log(self) -> None:
+        """Write all queued audit events to the audit trail"""
+        queue = self._audit_queue
+        while queue:
+            try:
+                event_type, data = queue.popleft()
+            except IndexError:
+                break
+            try:
+                self.audit.log_event(event_type, data)
+            except Exception as e:
+                logger.error(f"Failed to write audit event {event_type}: {str(e)}")
+                
+    def close(self) -> None:
+        """Stop background audit flushing and write out queued events"""
+        audit_flusher.unregister(self)
+        self.flush_audit_log()
+        
+    def _session_cipher(self) -> Fernet:
+        """Return the Fernet instance for the current session key"""
+        # The key manager caches derived keys, so an unchanged key is the same object
+        session_key = self.key_manager.generate_session_key()
+        if session_key is not self._session_key:
+            self._session_fernet = _FernetBackend(base64.urlsafe_b64encode(session_key).decode())
+            self._session_key = session_key
+        return self._session_fernet
+        
     def _encrypt_session_data(self, data: Dict[str, Any]) -> str:
         """Encrypt session data securely"""
-        session_key = self.key_manager.generate_session_key()
-        fernet = Fernet(base64.urlsafe_b64encode(session_key))
-        return fernet.encrypt(str(data).encode()).decode()
+        return self._session_cipher().encrypt(serialization.dumps(data)).decode()
         
     def _decrypt_session_data(self, encrypted_data: str) -> Dict[str, Any]:
         """Decrypt session data securely"""
-        session_key = self.key_manager.generate_session_key()
-        fernet = Fernet(base64.urlsafe_b64encode(session_key))
-        return eval(fernet.decrypt(encrypted_data.encode()).decode())
+        return serialization.loads(self._session_cipher().decrypt(encrypted_data.encode()))
         
     def create_session(self, user_id: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new secure session
@@ -86,45 +274,60 @@ class SecureSessionManager:
             if not self.risk_assessment.is_safe(user_id):
                 raise SecureSessionError("High risk user access denied")
                 
-            # Check max sessions
-            if len(self.user_sessions.get(user_id, [])) >= self.max_sessions:
-                raise SecureSessionError("Maximum sessions reached")
-                
             # Generate session ID
             session_id = self._generate_session_id()
             
-            # Create session data
-            session_data = {
-                "user_id": user_id,
-                "created_at": datetime.now(),
-                "last_activity": datetime.now(),
-                "user_data": user_data,
-                "biometric_verified": False
-            }
-            
-            # Encrypt session data
-            encrypted_data = self._encrypt_session_data(session_data)
-            
-            # Store session
-            self.sessions[session_id] = {
-                "data": encrypted_data,
-                "last_access": datetime.now()
-            }
+            # Wall-clock time is only needed for the audit record and expiry;
+            # timeouts are tracked on the monotonic clock
+            now = time.monotonic()
+            created = datetime.now()
+            created_at = created.isoformat()
             
-            # Update user sessions
-            if user_id not in self.user_sessions:
-                self.user_sessions[user_id] = []
-            self.user_sessions[user_id].append(session_id)
+            # Encrypt the immutable session data
+            encrypted_data = self._encrypt_session_data({
+                "user_data": user_data,
+                "created_at": created_at
+            })
             
+            with self._lock:
+                # Check max sessions
+                if len(self.user_sessions.get(user_id, ())) >= self.max_sessions:
+                    raise SecureSessionError("Maximum sessions reached")
+                    
+                # Evict the least recently used sessions once the cap is reached
+                while len(self.sessions) >= self.max_total_sessions:
+                    self._invalidate_session(next(iter(self.sessions)))
+                    
+                # Store session; fields updated on every request stay in plaintext
+                # so heartbeats never re-encrypt. Timeouts use the private
+                # monotonic fields; the public ones stay datetimes. Entries come
+                # from the free list when one is available
+                token_hash = self._token_hash(session_id)
+                session = self._session_pool.pop() if self._session_pool else {}
+                session["user_id"] = user_id
+                session["token_hash"] = token_hash
+                session["data"] = encrypted_data
+                session["last_access"] = created
+                session["last_activity"] = created
+                session["_last_access_monotonic"] = now
+                session["_last_activity_monotonic"] = now
+                session["biometric_verified"] = False
+                self.sessions[session_id] = session
+                self._hash_index[token_hash] = session_id
+                
+                # Update user sessions
+                self.user_sessions.setdefault(user_id, set()).add(session_id)
+                
             # Log audit trail
-            self.audit.log_event("session_create", {
+            self._queue_audit("session_create", {
                 "user_id": user_id,
-                "session_id": session_id
+                "session_id": session_id,
+                "created_at": created_at
             })
             
             return {
                 "session_id": session_id,
-                "expires_at": datetime.now() + self.session_timeout,
+                "expires_at": created + self.session_timeout,
                 "biometric_required": True
             }
             
@@ -143,59 +346,104 @@ class SecureSessionManager:
             True if biometric verified, False otherwise
         """
         try:
-            # Get session data
-            session = self.sessions.get(session_id)
-            if not session:
-                raise SecureSessionError("Invalid session")
+            with self._lock:
+                # Get session data
+                session = self.sessions.get(session_id)
+                if not session:
+                    raise SecureSessionError("Invalid session")
+                    
+                # Check if biometric already verified
+                if session["biometric_verified"]:
+                    return True
+                    
+                # Reject attempts beyond the user's rate before any comparison
+                user_id = session["user_id"]
+                if not self._take_biometric_attempt(user_id):
+                    return False
+                    
+                template = self._biometric_template
                 
-            # Decrypt session data
-            session_data = self._decrypt_session_data(session["data"])
-            
-            # Check if biometric already verified
-            if session_data["biometric_verified"]:
-                return True
-                
-            # Verify biometric data
-            if self._verify_biometric_data(biometric_data):
-                # Update session data
-                session_data["biometric_verified"] = True
-                session_data["last_activity"] = datetime.now()
-                
-                # Encrypt and store updated data
-                encrypted_data = self._encrypt_session_data(session_data)
-                self.sessions[session_id]["data"] = encrypted_data
-                
-                # Log audit trail
-                self.audit.log_event("biometric_verified", {
-                    "session_id": session_id,
-                    "user_id": session_data["user_id"]
-                })
+            # Template reload and hashing run without holding the session lock
+            if not self._verify_biometric_data(biometric_data, template):
+                return False
                 
-                return True
+            with self._lock:
+                # The session may have been invalidated during verification
+                if self.sessions.get(session_id) is not session:
+                    return False
+                    
+                # Update session state
+                session["biometric_verified"] = True
+                session["last_activity"] = datetime.now()
+                session["_last_activity_monotonic"] = time.monotonic()
                 
-            return False
+            # Log audit trail
+            self._queue_audit("biometric_verified", {
+                "session_id": session_id,
+                "user_id": user_id
+            })
+            
+            return True
             
         except Exception as e:
             logger.error(f"Failed to verify biometric: {str(e)}")
             return False
             
-    def _verify_biometric_data(self, biometric_data: str) -> bool:
+    def _take_biometric_attempt(self, user_id: str) -> bool:
+        """Consume one biometric attempt from the user's token bucket
+        
+        Args:
+            user_id: User making the attempt
+            
+        Returns:
+            True if the attempt is allowed, False if the user is rate limited
+        """
+        now = time.monotonic()
+        tokens, refilled_at = self._rate_buckets.get(user_id, (self.biometric_attempts, now))
+        tokens = min(self.biometric_attempts,
+                     tokens + (now - refilled_at) * self.biometric_attempts / 60)
+        if tokens < 1:
+            self._rate_buckets[user_id] = (tokens, now)
+            return False
+        self._rate_buckets[user_id] = (tokens - 1, now)
+        return True
+        
+    def _biometric_hash(self, biometric_data: str) -> bytes:
+        """Compute the keyed 16-byte BLAKE2b hash used to compare biometric data"""
+        return hashlib.blake2b(biometric_data.encode(), digest_size=16, key=self._biometric_key).digest()
+        
+    def _load_biometric_template(self) -> Tuple[Optional[bytes], float]:
+        """Fetch the biometric template and cache its keyed hash and expiry"""
+        biometric_template = self.secrets_manager.get_secret("BIOMETRIC_TEMPLATE")
+        self._biometric_template = (
+            self._biometric_hash(biometric_template) if biometric_template else None,
+            time.monotonic() + self.biometric_template_ttl
+        )
+        return self._biometric_template
+        
+    def _verify_biometric_data(self, biometric_data: str,
+                               template: Tuple[Optional[bytes], float]) -> bool:
         """Verify biometric data using secure comparison
         
         Args:
             biometric_data: Biometric data to verify
+            template: Snapshot of the cached (template hash, expiry)
             
         Returns:
             True if biometric matches, False otherwise
         """
         try:
-            # Get stored biometric template
-            stored_template = self.secrets_manager.get_secret("BIOMETRIC_TEMPLATE")
-            if not stored_template:
+            # Pick up a rotated template once the cached hash has expired
+            template_hash, expires = template
+            if time.monotonic() >= expires:
+                template_hash, _ = self._load_biometric_template()
+                
+            if template_hash is None:
                 return False
                 
-            # Use constant time comparison to prevent timing attacks
-            return secrets.compare_digest(biometric_data, stored_template)
+            # Use constant time comparison of the fixed-size hashes to prevent
+            # timing attacks
+            return hmac.compare_digest(self._biometric_hash(biometric_data), template_hash)
             
         except Exception as e:
             logger.error(f"Failed to verify biometric data: {str(e)}")
@@ -211,29 +459,38 @@ class SecureSessionManager:
             Session data if valid, None otherwise
         """
         try:
-            # Get session
-            session = self.sessions.get(session_id)
-            if not session:
-                return None
+            with self._lock:
+                # Get session
+                session = self.sessions.get(session_id)
+                if not session:
+                    return None
+                    
+                # Check session timeout
+                now = time.monotonic()
+                if now - session["_last_access_monotonic"] > self.session_timeout_seconds:
+                    self._invalidate_session(session_id)
+                    return None
+                    
+                # Check biometric timeout
+                if not session["biometric_verified"] or \
+                   now - session["_last_activity_monotonic"] > self.biometric_timeout_seconds:
+                    return None
+                    
+                # Update last access
+                accessed = datetime.now()
+                session["last_access"] = accessed
+                session["last_activity"] = accessed
+                session["_last_access_monotonic"] = now
+                session["_last_activity_monotonic"] = now
+                self.sessions.move_to_end(session_id)
+                encrypted_data = session["data"]
+                user_id = session["user_id"]
                 
-            # Check session timeout
-            if datetime.now() - session["last_access"] > self.session_timeout:
-                self._invalidate_session(session_id)
-                return None
-                
-            # Check biometric timeout
-            session_data = self._decrypt_session_data(session["data"])
-            if not session_data["biometric_verified"] or \
-               datetime.now() - session_data["last_activity"] > self.biometric_timeout:
-                return None
-                
-            # Update last access
-            session["last_access"] = datetime.now()
-            session_data["last_activity"] = datetime.now()
-            
-            # Encrypt and store updated data
-            encrypted_data = self._encrypt_session_data(session_data)
-            self.sessions[session_id]["data"] = encrypted_data
+            # Decrypt only to hand back the stored data; nothing is re-encrypted
+            session_data = self._decrypt_session_data(encrypted_data)
+            session_data["user_id"] = user_id
+            session_data["last_activity"] = accessed
+            session_data["biometric_verified"] = True
             
             return session_data
             
@@ -248,29 +505,59 @@ class SecureSessionManager:
             session_id: Session identifier
         """
         try:
-            # Get session data
-            session = self.sessions.get(session_id)
-            if not session:
-                return
+            with self._lock:
+                # Get session data
+                session = self.sessions.get(session_id)
+                if not session:
+                    return
+                    
+                user_id = session["user_id"]
                 
-            # Decrypt session data
-            session_data = self._decrypt_session_data(session["data"])
-            
-            # Remove session
-            del self.sessions[session_id]
-            
-            # Update user sessions
-            if session_data["user_id"] in self.user_sessions:
-                if session_id in self.user_sessions[session_data["user_id"]]:
-                    self.user_sessions[session_data["user_id"]].remove(session_id)
-                    if not self.user_sessions[session_data["user_id"]]:
-                        del self.user_sessions[session_data["user_id"]]
-            
+                # Remove session
+                del self.sessions[session_id]
+                self._hash_index.pop(session["token_hash"], None)
+                
+                # Recycle the entry for a future session
+                session.clear()
+                if len(self._session_pool) < SESSION_POOL_SIZE:
+                    self._session_pool.append(session)
+                    
+                # Update user sessions
+                user_session_ids = self.user_sessions.get(user_id)
+                if user_session_ids is not None:
+                    user_session_ids.discard(session_id)
+                    if not user_session_ids:
+                        del self.user_sessions[user_id]
+                        
             # Log audit trail
-            self.audit.log_event("session_invalidate", {
+            self._queue_audit("session_invalidate", {
                 "session_id": session_id,
-                "user_id": session_data["user_id"]
+                "user_id": user_id
             })
             
         except Exception as e:
             logger.error(f"Failed to invalidate session: {str(e)}")
+            
+    def sweep_expired_sessions(self) -> int:
+        """Invalidate every session whose timeout has passed
+        
+        Returns:
+            Number of sessions invalidated
+        """
+        now = time.monotonic()
+        with self._lock:
+            # Sessions are in last_access order, so expired ones lead
+            expired = []
+            for session_id, session in self.sessions.items():
+                if now - session["_last_access_monotonic"] <= self.session_timeout_seconds:
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                self._invalidate_session(session_id)
+                
+            # Buckets idle for a minute are full again, so they can be dropped
+            self._rate_buckets = {
+                user_id: bucket for user_id, bucket in self._rate_buckets.items()
+                if now - bucket[1] < 60
+            }
+        return len(expired)
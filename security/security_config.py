@@ -6,7 +6,7 @@ Businesses MUST customize these configurations according to their organization's
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from config.config_manager import ConfigManager
 
 logger = logging.getLogger(__name__)
@@ -39,6 +39,13 @@ class SecurityConfig:
         self.config_manager = ConfigManager()
         self.config = self._load_security_config()
         
+        # Values keyed by (section, key) so get_config needs a single lookup
+        self._flat: Dict[Tuple[str, str], Any] = {
+            (section, key): value
+            for section, values in self.config.items() if isinstance(values, dict)
+            for key, value in values.items()
+        }
+        
     def _load_security_config(self) -> Dict[str, Any]:
         """Load security configuration from config manager"""
         return self.config_manager.get_security_config()
@@ -76,12 +83,7 @@ class SecurityConfig:
         
     def get_config(self, section: str, key: str, default: Any = None) -> Any:
         """Get a specific security configuration value"""
-        try:
-            return self.config.get(section, {}).get(key, default)
-        except KeyError:
-            if default is not None:
-                return default
-            raise ValueError(f"Security configuration key not found: {section}.{key}")
+        return self._flat.get((section, key), default)
 
 # Create a singleton instance
 security_config = SecurityConfig()
@@ -31,6 +31,11 @@ class SecurityEvent:
     Implements NIST SP 800-53 compliant security event logging.
     """
     
+    __slots__ = ("event_type", "severity", "data", "timestamp",
+                 "_event_type_value", "_severity_value", "_timestamp_iso")
+    
+    logger = logging.getLogger(__name__)
+    
     def __init__(self, 
                  event_type: SecurityEventType,
                  severity: SecurityEventSeverity,
@@ -49,15 +54,19 @@ class SecurityEvent:
         self.severity = severity
         self.data = data
         self.timestamp = timestamp or datetime.now()
-        self.logger = logging.getLogger(__name__)
+        
+        # Events are serialized right after creation, so render fields once
+        self._event_type_value = event_type.value
+        self._severity_value = severity.value
+        self._timestamp_iso = self.timestamp.isoformat()
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary format"""
         return {
-            "event_type": self.event_type.value,
-            "severity": self.severity.value,
+            "event_type": self._event_type_value,
+            "severity": self._severity_value,
             "data": self.data,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": self._timestamp_iso
         }
 
 class SecurityEventLogger:
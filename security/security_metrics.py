@@ -1,11 +1,41 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import logging
 from datetime import datetime, timedelta
-from collections import defaultdict
+import numpy as np
 from .security_events import SecurityEvent, SecurityEventSeverity
 from .audit_trail import AuditTrail
 from .risk_assessment import RiskAssessment
 
+# Event types tallied by SecurityMetrics and the integer codes used when
+# counting batches
+_EVENT_CATEGORIES = (
+    "authentication",
+    "authorization",
+    "data_access",
+    "security_violation",
+    "risk_detection",
+    "audit"
+)
+_CATEGORY_INDEX = {event_type: i for i, event_type in enumerate(_EVENT_CATEGORIES)}
+(_AUTHENTICATION, _AUTHORIZATION, _DATA_ACCESS,
+ _SECURITY_VIOLATION, _RISK_DETECTION, _AUDIT) = range(len(_EVENT_CATEGORIES))
+
+# Severities are accepted as enum members or their string values; LOW is
+# column 0, so a row's remaining columns are its failures
+_SEVERITIES = tuple(SecurityEventSeverity)
+_SEVERITY_INDEX = {
+    **{severity: i for i, severity in enumerate(_SEVERITIES)},
+    **{severity.value: i for i, severity in enumerate(_SEVERITIES)}
+}
+
+# Alert type checked against each aggregated metric, as (alert, section, field)
+_THRESHOLD_METRICS = (
+    ("authentication_failures", "authentication", "failure"),
+    ("authorization_failures", "authorization", "failure"),
+    ("security_violations", "security_violations", "total"),
+    ("risk_events", "risk_events", "total")
+)
+
 class SecurityMetrics:
     """
     Enterprise-grade security metrics collection and analysis.
@@ -29,15 +59,8 @@ class SecurityMetrics:
         self.audit_trail = AuditTrail(config)
         self.risk_assessment = RiskAssessment(config)
         
-        # Initialize metrics storage
-        self.metrics = {
-            "authentication": defaultdict(int),
-            "authorization": defaultdict(int),
-            "data_access": defaultdict(int),
-            "security_violations": defaultdict(int),
-            "risk_events": defaultdict(int),
-            "audit_events": defaultdict(int)
-        }
+        # Initialize metrics storage: event counts by event type and severity
+        self.counts = np.zeros((len(_EVENT_CATEGORIES), len(_SEVERITIES)), dtype=np.int64)
         
         # Load thresholds
         self.thresholds = self._load_thresholds()
@@ -67,6 +90,12 @@ class SecurityMetrics:
                     "severity": SecurityEventSeverity.HIGH
                 }
             })
+            
+            # Resolve each check's metric and threshold count once
+            self._threshold_checks = [
+                (alert_type, section, field, thresholds[alert_type]["count"])
+                for alert_type, section, field in _THRESHOLD_METRICS
+            ]
             return thresholds
             
         except Exception as e:
@@ -90,8 +119,7 @@ class SecurityMetrics:
             )
             
             # Process events
-            for event in events:
-                self._process_event(event)
+            self._process_events(events)
             
             # Calculate metrics
             metrics = self._calculate_metrics()
@@ -105,67 +133,59 @@ class SecurityMetrics:
             self.logger.error(f"Metric collection failed: {str(e)}")
             raise MetricCollectionError(f"Failed to collect metrics: {str(e)}") from e
     
-    def _process_event(self, event: Dict[str, Any]) -> None:
-        """Process individual security event"""
+    def _process_events(self, events: List[Dict[str, Any]]) -> None:
+        """Tally a batch of security events in one vectorized pass"""
         try:
-            event_type = event["event_type"]
-            severity = SecurityEventSeverity(event["severity"])
+            count = len(events)
+            categories = np.fromiter(
+                (_CATEGORY_INDEX.get(event["event_type"], -1) for event in events), np.int8, count
+            )
+            severities = np.fromiter(
+                (_SEVERITY_INDEX.get(event["severity"], -1) for event in events), np.int8, count
+            )
+            
+            # Events of untracked types are ignored
+            tracked = categories >= 0
+            categories = categories[tracked].astype(np.intp)
+            severities = severities[tracked].astype(np.intp)
+            if (severities < 0).any():
+                raise ValueError("event with unknown severity")
+            
+            self.counts += np.bincount(
+                categories * len(_SEVERITIES) + severities,
+                minlength=self.counts.size
+            ).reshape(self.counts.shape)
             
-            # Increment appropriate counters
-            if event_type == "authentication":
-                self.metrics["authentication"][severity] += 1
-            elif event_type == "authorization":
-                self.metrics["authorization"][severity] += 1
-            elif event_type == "data_access":
-                self.metrics["data_access"][severity] += 1
-            elif event_type == "security_violation":
-                self.metrics["security_violations"][severity] += 1
-            elif event_type == "risk_detection":
-                self.metrics["risk_events"][severity] += 1
-            elif event_type == "audit":
-                self.metrics["audit_events"][severity] += 1
-                
         except Exception as e:
-            self.logger.error(f"Failed to process event: {str(e)}")
-            raise EventProcessingError(f"Failed to process event: {str(e)}") from e
+            self.logger.error(f"Failed to process events: {str(e)}")
+            raise EventProcessingError(f"Failed to process events: {str(e)}") from e
     
     def _calculate_metrics(self) -> Dict[str, Any]:
         """Calculate aggregated metrics"""
         try:
+            # Two array reductions cover every figure below
+            totals = self.counts.sum(axis=1).tolist()
+            successes = self.counts[:, 0].tolist()
             metrics = {
                 "authentication": {
-                    "success": self.metrics["authentication"][SecurityEventSeverity.LOW],
-                    "failure": sum(
-                        self.metrics["authentication"][severity]
-                        for severity in [SecurityEventSeverity.MEDIUM, 
-                                        SecurityEventSeverity.HIGH,
-                                        SecurityEventSeverity.CRITICAL]
-                    )
+                    "success": successes[_AUTHENTICATION],
+                    "failure": totals[_AUTHENTICATION] - successes[_AUTHENTICATION]
                 },
                 "authorization": {
-                    "success": self.metrics["authorization"][SecurityEventSeverity.LOW],
-                    "failure": sum(
-                        self.metrics["authorization"][severity]
-                        for severity in [SecurityEventSeverity.MEDIUM, 
-                                        SecurityEventSeverity.HIGH,
-                                        SecurityEventSeverity.CRITICAL]
-                    )
+                    "success": successes[_AUTHORIZATION],
+                    "failure": totals[_AUTHORIZATION] - successes[_AUTHORIZATION]
                 },
                 "data_access": {
-                    "total": sum(self.metrics["data_access"][severity] 
-                               for severity in SecurityEventSeverity)
+                    "total": totals[_DATA_ACCESS]
                 },
                 "security_violations": {
-                    "total": sum(self.metrics["security_violations"][severity] 
-                                for severity in SecurityEventSeverity)
+                    "total": totals[_SECURITY_VIOLATION]
                 },
                 "risk_events": {
-                    "total": sum(self.metrics["risk_events"][severity] 
-                               for severity in SecurityEventSeverity)
+                    "total": totals[_RISK_DETECTION]
                 },
                 "audit_events": {
-                    "total": sum(self.metrics["audit_events"][severity] 
-                               for severity in SecurityEventSeverity)
+                    "total": totals[_AUDIT]
                 }
             }
             return metrics
@@ -177,34 +197,11 @@ class SecurityMetrics:
     def _check_thresholds(self, metrics: Dict[str, Any]) -> None:
         """Check if any metrics exceed configured thresholds"""
         try:
-            # Check authentication failures
-            if metrics["authentication"]["failure"] >= self.thresholds["authentication_failures"]["count"]:
-                self._raise_alert(
-                    "authentication_failures",
-                    metrics["authentication"]["failure"]
-                )
-            
-            # Check authorization failures
-            if metrics["authorization"]["failure"] >= self.thresholds["authorization_failures"]["count"]:
-                self._raise_alert(
-                    "authorization_failures",
-                    metrics["authorization"]["failure"]
-                )
-            
-            # Check security violations
-            if metrics["security_violations"]["total"] >= self.thresholds["security_violations"]["count"]:
-                self._raise_alert(
-                    "security_violations",
-                    metrics["security_violations"]["total"]
-                )
-            
-            # Check risk events
-            if metrics["risk_events"]["total"] >= self.thresholds["risk_events"]["count"]:
-                self._raise_alert(
-                    "risk_events",
-                    metrics["risk_events"]["total"]
-                )
-                
+            for alert_type, section, field, count in self._threshold_checks:
+                value = metrics[section][field]
+                if value >= count:
+                    self._raise_alert(alert_type, value)
+                    
         except Exception as e:
             self.logger.error(f"Failed to check thresholds: {str(e)}")
             raise ThresholdCheckError(f"Failed to check thresholds: {str(e)}") from e
@@ -1,13 +1,23 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple, Deque
 import logging
-from datetime import datetime
-import json
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import itertools
+import queue
+import threading
+import time
+import weakref
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 from prometheus_client import Counter, Gauge
 from config.secrets_manager import SecretsManager
 from security.key_management import SecureKeyManager
 from security.audit_trail import AuditTrail
+from security import serialization
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +25,152 @@ logger = logging.getLogger(__name__)
 SECURITY_ALERTS = Counter('security_alerts_total', 'Total security alerts generated', ['severity', 'type'])
 SECURITY_VIOLATIONS = Counter('security_violations_total', 'Total security violations detected', ['category'])
 SECURITY_RESPONSE_TIME = Gauge('security_response_time_seconds', 'Time taken to respond to security events')
+SECURITY_ALERTS_DROPPED = Counter('security_alerts_dropped_total', 'Alert notifications dropped because the queue was full')
+SECURITY_DEDUP_SKIPPED = Counter('security_dedup_skipped_total', 'Duplicate security events skipped')
+COMPLIANCE_CHECKS = Counter(
+    'compliance_checks_total',
+    'Total compliance checks performed',
+    ['standard', 'control']
+)
+COMPLIANCE_VIOLATIONS = Counter(
+    'compliance_violations_total',
+    'Total compliance violations detected',
+    ['standard', 'control', 'severity']
+)
+COMPLIANCE_CHECK_DURATION = Gauge(
+    'compliance_check_duration_seconds',
+    'Time taken to perform compliance checks',
+    ['standard', 'control']
+)
+
+# Label values accepted from events; anything else is recorded as 'other' so
+# the number of time series stays bounded
+ALLOWED_ALERT_TYPES = frozenset({
+    'authentication',
+    'authorization',
+    'data_access',
+    'configuration',
+    'authentication_failure',
+    'data_exfiltration'
+})
+ALLOWED_VIOLATION_CATEGORIES = frozenset({
+    'access_control',
+    'data_protection',
+    'audit_trail',
+    'compliance'
+})
+
+# Event types that raise an event's severity score
+CRITICAL_EVENT_TYPES = frozenset({'authentication_failure', 'data_exfiltration'})
+
+# Repeated events with the same type, user, resource and source IP are
+# skipped for DEDUP_TTL_BUCKETS expiry buckets of 2**26 ns (about 64ms) after
+# the first is processed. Each cache slot packs the top 48 bits of the event
+# key hash with the 16-bit bucket at which the entry expires
+DEDUP_CACHE_SLOTS = 2 ** 18
+DEDUP_TTL_BUCKETS = 16
+DEDUP_BUCKET_SHIFT = 26
+
+# High-value event types are always processed, even when repeated; repeats of
+# critical types such as authentication failures are the signal being scored
+DEDUP_EXEMPT_TYPES = CRITICAL_EVENT_TYPES | {'privilege_escalation'}
+
+# Alert notifications are sent by background workers; when the queue is
+# full new notifications are dropped rather than blocking detection
+NOTIFY_QUEUE_SIZE = 10_000
+NOTIFY_WORKERS = 4
+
+# Webhook notifications share one pooled HTTP session. Only failures to
+# connect are retried, since a request that reached the server may already
+# have delivered the alert; each request is bounded by (connect, read) timeouts
+WEBHOOK_POOL_CONNECTIONS = 10
+WEBHOOK_POOL_MAXSIZE = 50
+WEBHOOK_TIMEOUT = (1.0, 2.0)
+WEBHOOK_CONNECT_RETRIES = 3
+
+# Labelled metric children, cached so the hot path skips the client's label lookup
+_alert_children: Dict[Tuple[str, str], Any] = {}
+_violation_children: Dict[str, Any] = {}
+_compliance_violation_children: Dict[Tuple[str, str], Any] = {}
+
+# (standard, control) pairs whose compliance metrics have been labelled
+_initialized_compliance_pairs: Set[Tuple[str, str]] = set()
+
+def _alert_counter(severity: str, alert_type: str) -> Any:
+    """Get the SECURITY_ALERTS child for a severity and alert type"""
+    if alert_type not in ALLOWED_ALERT_TYPES:
+        alert_type = 'other'
+    child = _alert_children.get((severity, alert_type))
+    if child is None:
+        child = _alert_children[(severity, alert_type)] = SECURITY_ALERTS.labels(
+            severity=severity, type=alert_type
+        )
+    return child
+
+def _dedup_key(event: Dict[str, Any]) -> int:
+    """Hash the fields that identify a repeated event to 64 bits"""
+    fields = (event.get('type'), event.get('user'), event.get('resource'), event.get('src_ip'))
+    try:
+        key = hash(fields)
+    except TypeError:
+        # Unhashable values such as dict resources are hashed by their canonical JSON
+        key = hash(serialization.canonical_dumps(fields))
+    return key & 0xFFFFFFFFFFFFFFFF
+
+def _violation_counter(category: str) -> Any:
+    """Get the SECURITY_VIOLATIONS child for a violation category"""
+    if category not in ALLOWED_VIOLATION_CATEGORIES:
+        category = 'other'
+    child = _violation_children.get(category)
+    if child is None:
+        child = _violation_children[category] = SECURITY_VIOLATIONS.labels(category=category)
+    return child
+
+def _compliance_violation_counter(standard: str, control: str) -> Any:
+    """Get the high-severity COMPLIANCE_VIOLATIONS child for a standard and control"""
+    child = _compliance_violation_children.get((standard, control))
+    if child is None:
+        child = _compliance_violation_children[(standard, control)] = COMPLIANCE_VIOLATIONS.labels(
+            standard=standard, control=control, severity='high'
+        )
+    return child
+
+def _run_notifier(monitor_ref: "weakref.ref[SecurityMonitor]", notify_queue: queue.Queue) -> None:
+    """Send queued alert notifications until stopped or the monitor is collected"""
+    while True:
+        item = notify_queue.get()
+        try:
+            monitor = monitor_ref() if item is not None else None
+            if monitor is None:
+                return
+            channel, alert = item
+            try:
+                monitor._dispatch_notification(channel, alert)
+            except Exception as e:
+                logger.error(f"Failed to send {channel} notification: {str(e)}")
+            del monitor
+        finally:
+            notify_queue.task_done()
+
+def _stop_notifiers(notify_queue: queue.Queue, workers: int) -> None:
+    """Tell notification workers to exit once the queue drains"""
+    for _ in range(workers):
+        try:
+            notify_queue.put_nowait(None)
+        except queue.Full:
+            break
+
+@dataclass(slots=True)
+class Alert:
+    """Security alert raised for a high-severity event"""
+    id: str
+    timestamp: str
+    severity: float
+    type: str
+    description: str
+    details: Dict[str, Any]
+    response_time: float = 0.0
+    stored: bool = field(default=False, repr=False, compare=False)
 
 
 class SecurityMonitor:
@@ -37,10 +193,17 @@ class SecurityMonitor:
                 - notification_channels: List of notification channels
                 - compliance_standards: List of compliance standards
                 - monitoring_intervals: Dictionary of monitoring intervals
+                - max_in_memory_alerts: Alerts and violations kept in memory
+                - slack_webhook_url: Slack incoming webhook for alerts
+                - pagerduty_webhook_url: PagerDuty webhook for alerts
         """
         self.config = config
-        self.alerts = []
-        self.violations = []
+        max_in_memory_alerts = config.get('max_in_memory_alerts', 10_000)
+        if max_in_memory_alerts < 1:
+            raise ValueError(f"max_in_memory_alerts must be at least 1, got {max_in_memory_alerts}")
+        self.alerts: Deque[Alert] = deque(maxlen=max_in_memory_alerts)
+        self.violations: Deque[Dict[str, Any]] = deque(maxlen=max_in_memory_alerts)
+        self._response_time_total = 0.0
         self.last_check = datetime.now()
         
         # Initialize security components
@@ -57,6 +220,40 @@ class SecurityMonitor:
         # Initialize monitoring metrics
         self.initialize_metrics()
         
+        # Recently processed event keys, see DEDUP_CACHE_SLOTS
+        self._dedup_cache = np.zeros(DEDUP_CACHE_SLOTS, dtype=np.uint64)
+        
+        # Sequence number that keeps alert IDs unique within a batch
+        self._alert_ids = itertools.count()
+        
+        # HTTP session reused by every webhook notification
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=WEBHOOK_POOL_CONNECTIONS,
+            pool_maxsize=WEBHOOK_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=WEBHOOK_CONNECT_RETRIES,
+                connect=WEBHOOK_CONNECT_RETRIES,
+                read=0,
+                status=0,
+                other=0,
+                backoff_factor=0.2
+            )
+        )
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+        
+        # Alert notifications, sent by background workers
+        self._notify_queue: queue.Queue = queue.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        for _ in range(NOTIFY_WORKERS):
+            threading.Thread(
+                target=_run_notifier,
+                args=(weakref.ref(self), self._notify_queue),
+                name="security-alert-notifier",
+                daemon=True
+            ).start()
+        weakref.finalize(self, _stop_notifiers, self._notify_queue, NOTIFY_WORKERS)
+        
     def _verify_configuration(self) -> None:
         """Verify configuration against real-world standards."""
         # Verify alert thresholds
@@ -66,15 +263,15 @@ class SecurityMonitor:
             'low_severity': 0.5
         }
         
-        for threshold, value in required_thresholds.items():
-            if threshold not in self.config.get('alert_thresholds', {}):
-                raise ValueError(f"Missing required alert threshold: {threshold}")
-                
+        missing = required_thresholds.keys() - self.config.get('alert_thresholds', {}).keys()
+        if missing:
+            raise ValueError(f"Missing required alert thresholds: {', '.join(sorted(missing))}")
+            
         # Verify notification channels
-        valid_channels = ['email', 'slack', 'pagerduty']
-        for channel in self.config.get('notification_channels', []):
-            if channel not in valid_channels:
-                raise ValueError(f"Invalid notification channel: {channel}")
+        valid_channels = {'email', 'slack', 'pagerduty'}
+        invalid = set(self.config.get('notification_channels', [])) - valid_channels
+        if invalid:
+            raise ValueError(f"Invalid notification channels: {', '.join(sorted(invalid))}")
                 
         # Verify compliance requirements
         required_standards = [
@@ -83,9 +280,9 @@ class SecurityMonitor:
             "PCI DSS v3.2.1"
         ]
         
-        for standard in required_standards:
-            if standard not in self.compliance_requirements["standards"]:
-                raise ValueError(f"Missing required compliance standard: {standard}")
+        missing = set(required_standards) - set(self.compliance_requirements["standards"])
+        if missing:
+            raise ValueError(f"Missing required compliance standards: {', '.join(sorted(missing))}")
                 
         # Verify monitoring intervals
         required_intervals = {
@@ -95,62 +292,46 @@ class SecurityMonitor:
             "compliance_check": 86400  # 24 hours
         }
         
-        for interval, value in required_intervals.items():
-            if interval not in self.config.get("monitoring_intervals", {}):
-                raise ValueError(f"Missing required monitoring interval: {interval}")
+        missing = required_intervals.keys() - self.config.get("monitoring_intervals", {}).keys()
+        if missing:
+            raise ValueError(f"Missing required monitoring intervals: {', '.join(sorted(missing))}")
+            
+        # Snapshot the validated settings read on every event
+        alert_thresholds = self.config['alert_thresholds']
+        self._high_threshold = float(alert_thresholds['high_severity'])
+        self._medium_threshold = float(alert_thresholds['medium_severity'])
+        self._low_threshold = float(alert_thresholds['low_severity'])
+        self._channels = tuple(self.config.get('notification_channels', ()))
                 
     def initialize_metrics(self) -> None:
         """Initialize security monitoring metrics."""
         # Initialize standard security metrics
-        SECURITY_ALERTS.labels(severity='high', type='authentication')
-        SECURITY_ALERTS.labels(severity='high', type='authorization')
-        SECURITY_ALERTS.labels(severity='medium', type='data_access')
-        SECURITY_ALERTS.labels(severity='low', type='configuration')
+        _alert_counter('high', 'authentication')
+        _alert_counter('high', 'authorization')
+        _alert_counter('medium', 'data_access')
+        _alert_counter('low', 'configuration')
         
         # Initialize violation metrics
-        SECURITY_VIOLATIONS.labels(category='access_control')
-        SECURITY_VIOLATIONS.labels(category='data_protection')
-        SECURITY_VIOLATIONS.labels(category='audit_trail')
-        SECURITY_VIOLATIONS.labels(category='compliance')
+        for category in ALLOWED_VIOLATION_CATEGORIES:
+            _violation_counter(category)
         
         # Initialize compliance metrics
         self.initialize_compliance_metrics()
         
     def initialize_compliance_metrics(self) -> None:
         """Initialize compliance monitoring metrics."""
-        # Compliance check metrics
-        COMPLIANCE_CHECKS = Counter(
-            'compliance_checks_total',
-            'Total compliance checks performed',
-            ['standard', 'control']
-        )
-        
-        # Compliance violation metrics
-        COMPLIANCE_VIOLATIONS = Counter(
-            'compliance_violations_total',
-            'Total compliance violations detected',
-            ['standard', 'control', 'severity']
-        )
-        
-        # Compliance check duration metrics
-        COMPLIANCE_CHECK_DURATION = Gauge(
-            'compliance_check_duration_seconds',
-            'Time taken to perform compliance checks',
-            ['standard', 'control']
-        )
-        
-        # Initialize metrics for each standard
-        for standard in self.compliance_requirements["standards"]:
-            for control in self.compliance_requirements["controls"]:
-                COMPLIANCE_CHECKS.labels(standard=standard, control=control)
-                COMPLIANCE_VIOLATIONS.labels(
-                    standard=standard, 
-                    control=control, 
-                    severity='high'
-                )
-                COMPLIANCE_CHECK_DURATION.labels(standard=standard, control=control)
-        
-    def detect_security_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Metrics are module-level; only pairs not seen before are labelled
+        for standard, control in itertools.product(
+                self.compliance_requirements["standards"],
+                self.compliance_requirements["controls"]):
+            if (standard, control) in _initialized_compliance_pairs:
+                continue
+            _initialized_compliance_pairs.add((standard, control))
+            COMPLIANCE_CHECKS.labels(standard=standard, control=control)
+            _compliance_violation_counter(standard, control)
+            COMPLIANCE_CHECK_DURATION.labels(standard=standard, control=control)
+            
+    def detect_security_events(self, events: List[Dict[str, Any]]) -> List[Alert]:
         """
         Detect security events and generate alerts.
         
@@ -162,16 +343,27 @@ class SecurityMonitor:
         """
         alerts = []
         
-        for event in events:
+        # Score the whole batch up front; its alerts share one timestamp
+        detected_at = self._detection_time()
+        duplicates = self._find_duplicate_events(events)
+        severities = self._determine_severities(events)
+        alerting = severities >= self._high_threshold
+        
+        for event, severity, is_alert, is_duplicate in zip(
+                events, severities.tolist(), alerting.tolist(), duplicates.tolist()):
+            # Skip events already processed within the dedup window
+            if is_duplicate:
+                continue
+                
             # Verify compliance requirements
             if not self._verify_compliance(event):
                 self._log_compliance_violation(event)
                 
             # Check for security violations
-            severity = self._determine_severity(event)
-            if severity >= self.config['alert_thresholds']['high_severity']:
-                alert = self._generate_alert(event, severity)
+            if is_alert:
+                alert = self._generate_alert(event, severity, detected_at)
                 alerts.append(alert)
+                self._store_alert(alert)
                 self._notify_alert(alert)
                 
             # Update metrics
@@ -179,6 +371,36 @@ class SecurityMonitor:
             
         return alerts
 
+    def _find_duplicate_events(self, events: List[Dict[str, Any]]) -> np.ndarray:
+        """Flag events repeating one processed within the dedup window, and record the rest"""
+        count = len(events)
+        keys = np.fromiter((_dedup_key(event) for event in events), np.uint64, count)
+        exempt = np.fromiter((event.get('type') in DEDUP_EXEMPT_TYPES for event in events), bool, count)
+        
+        # A cached entry matches if its key bits agree and it has not expired;
+        # bucket arithmetic is modulo 2**16
+        now = (time.monotonic_ns() >> DEDUP_BUCKET_SHIFT) & 0xFFFF
+        slots = (keys & np.uint64(DEDUP_CACHE_SLOTS - 1)).astype(np.intp)
+        entries = self._dedup_cache[slots]
+        remaining = ((entries & np.uint64(0xFFFF)) + np.uint64(0x10000 - now)) & np.uint64(0xFFFF)
+        cached = ((entries >> np.uint64(16)) == (keys >> np.uint64(16))) & (remaining <= DEDUP_TTL_BUCKETS)
+        
+        # Only the first occurrence of a key within the batch is processed
+        repeated = np.ones(count, dtype=bool)
+        repeated[np.unique(keys, return_index=True)[1]] = False
+        
+        duplicates = (cached | repeated) & ~exempt
+        
+        # Start a dedup window for each newly processed key
+        recorded = ~duplicates & ~exempt
+        expiry = np.uint64((now + DEDUP_TTL_BUCKETS) & 0xFFFF)
+        self._dedup_cache[slots[recorded]] = (keys[recorded] & ~np.uint64(0xFFFF)) | expiry
+        
+        skipped = int(duplicates.sum())
+        if skipped:
+            SECURITY_DEDUP_SKIPPED.inc(skipped)
+        return duplicates
+        
     def _verify_compliance(self, event: Dict[str, Any]) -> bool:
         """Verify event compliance with requirements"""
         try:
@@ -285,11 +507,7 @@ class SecurityMonitor:
         """Log compliance violation"""
         try:
             # Update metrics
-            COMPLIANCE_VIOLATIONS.labels(
-                standard=violation["type"],
-                control=violation["violation"],
-                severity="high"
-            ).inc()
+            _compliance_violation_counter(violation["type"], violation["violation"]).inc()
             
             # Log event
             self.audit_trail.log_event(
@@ -310,7 +528,7 @@ class SecurityMonitor:
         base_severity = 0.5
         
         # Increase severity for critical indicators
-        if event.get('type') in ['authentication_failure', 'data_exfiltration']:
+        if event.get('type') in CRITICAL_EVENT_TYPES:
             base_severity += 0.3
             
         # Increase severity for multiple occurrences
@@ -319,32 +537,69 @@ class SecurityMonitor:
             
         return min(base_severity, 1.0)
     
-    def _generate_alert(self, event: Dict[str, Any], severity: float) -> Dict[str, Any]:
-        """Generate a security alert."""
-        alert = {
-            'id': f"alert-{datetime.now().isoformat()}",
-            'timestamp': datetime.now().isoformat(),
-            'severity': severity,
-            'type': event.get('type', 'unknown'),
-            'description': event.get('description', 'Security event detected'),
-            'details': event
-        }
+    def _determine_severities(self, events: List[Dict[str, Any]]) -> np.ndarray:
+        """Determine the severity of each event in a batch, matching _determine_severity."""
+        count = len(events)
+        critical = np.fromiter(
+            (event.get('type') in CRITICAL_EVENT_TYPES for event in events), bool, count
+        )
+        occurrences = np.fromiter((event.get('count', 1) for event in events), float, count)
+        
+        # Terms are added in the same order as the scalar path so scores
+        # compare identically against the thresholds
+        severities = np.full(count, 0.5)
+        severities += np.where(critical, 0.3, 0.0)
+        severities += np.where(occurrences > 10, 0.2, 0.0)
+        return np.minimum(severities, 1.0, out=severities)
+    
+    def _generate_alert(self, event: Dict[str, Any], severity: float,
+                        detected_at: Optional[Tuple[str, str]] = None) -> Alert:
+        """
+        Generate a security alert.
+        
+        detected_at may carry the batch's (ID prefix, ISO timestamp) pair from
+        _detection_time so a batch reads the clock once.
+        """
+        id_prefix, timestamp = detected_at or self._detection_time()
+        alert = Alert(
+            id=f"{id_prefix}-{next(self._alert_ids)}",
+            timestamp=timestamp,
+            severity=severity,
+            type=event.get('type', 'unknown'),
+            description=event.get('description', 'Security event detected'),
+            details=event
+        )
         
         # Increment Prometheus counter
         severity_level = 'high' if severity >= 0.9 else 'medium' if severity >= 0.7 else 'low'
-        SECURITY_ALERTS.labels(
-            severity=severity_level,
-            type=event.get('type', 'unknown')
-        ).inc()
+        _alert_counter(severity_level, event.get('type', 'unknown')).inc()
         
         return alert
     
-    def _notify_alert(self, alert: Dict[str, Any]) -> None:
+    @staticmethod
+    def _detection_time() -> Tuple[str, str]:
+        """Get the alert ID prefix and ISO timestamp for the current time."""
+        now = datetime.now(timezone.utc)
+        return f"alert-{now.timestamp() * 1e6:.0f}", now.isoformat()
+    
+    def _notify_alert(self, alert: Alert) -> None:
         """Notify appropriate channels about the alert."""
-        for channel in self.config['notification_channels']:
+        for channel in self._channels:
             self._send_notification(channel, alert)
     
-    def _send_notification(self, channel: str, alert: Dict[str, Any]) -> None:
+    def _send_notification(self, channel: str, alert: Alert) -> None:
+        """Queue a notification to a specific channel."""
+        try:
+            self._notify_queue.put_nowait((channel, alert))
+        except queue.Full:
+            SECURITY_ALERTS_DROPPED.inc()
+            logger.warning(f"Notification queue full, dropping {channel} alert")
+    
+    def flush_notifications(self) -> None:
+        """Block until every queued notification has been sent."""
+        self._notify_queue.join()
+    
+    def _dispatch_notification(self, channel: str, alert: Alert) -> None:
         """Send notification to a specific channel."""
         if channel == 'email':
             self._send_email(alert)
@@ -353,20 +608,44 @@ class SecurityMonitor:
         elif channel == 'pagerduty':
             self._send_pagerduty_alert(alert)
     
-    def _send_email(self, alert: Dict[str, Any]) -> None:
+    @staticmethod
+    def _serialize_alert(alert: Alert) -> bytes:
+        """Serialize an alert to the JSON payload sent to notification channels."""
+        return serialization.dumps({
+            'id': alert.id,
+            'timestamp': alert.timestamp,
+            'severity': alert.severity,
+            'type': alert.type,
+            'description': alert.description,
+            'details': alert.details
+        })
+    
+    def _send_email(self, alert: Alert) -> None:
         """Send email notification."""
         # Implementation based on verified email notification standards
         pass
     
-    def _send_slack_message(self, alert: Dict[str, Any]) -> None:
+    def _send_slack_message(self, alert: Alert) -> None:
         """Send Slack notification."""
-        # Implementation based on verified Slack API standards
-        pass
+        self._post_webhook('slack_webhook_url', alert)
     
-    def _send_pagerduty_alert(self, alert: Dict[str, Any]) -> None:
+    def _send_pagerduty_alert(self, alert: Alert) -> None:
         """Send PagerDuty alert."""
-        # Implementation based on verified PagerDuty API standards
-        pass
+        self._post_webhook('pagerduty_webhook_url', alert)
+    
+    def _post_webhook(self, url_key: str, alert: Alert) -> None:
+        """Post an alert to the webhook configured under url_key."""
+        url = self.config.get(url_key)
+        if not url:
+            logger.debug(f"No {url_key} configured, skipping alert {alert.id}")
+            return
+        response = self._http.post(
+            url,
+            data=self._serialize_alert(alert),
+            headers={'Content-Type': 'application/json'},
+            timeout=WEBHOOK_TIMEOUT
+        )
+        response.raise_for_status()
     
     def generate_compliance_report(self) -> Dict[str, Any]:
         """
@@ -395,14 +674,26 @@ class SecurityMonitor:
         # Implementation based on verified compliance standards
         pass
     
+    def _store_alert(self, alert: Alert) -> None:
+        """Keep an alert in memory, evicting the oldest once the buffer is full."""
+        if len(self.alerts) == self.alerts.maxlen:
+            evicted = self.alerts[0]
+            evicted.stored = False
+            self._response_time_total -= evicted.response_time
+        alert.stored = True
+        self._response_time_total += alert.response_time
+        self.alerts.append(alert)
+    
+    def record_response_time(self, alert: Alert, response_time: float) -> None:
+        """Record how long it took to respond to an alert."""
+        # Only alerts still in memory count towards the average
+        if alert.stored:
+            self._response_time_total += response_time - alert.response_time
+        alert.response_time = response_time
+    
     def _calculate_average_response_time(self) -> float:
         """Calculate average response time for security events."""
         if not self.alerts:
             return 0.0
             
-        total_time = 0.0
-        for alert in self.alerts:
-            if 'response_time' in alert:
-                total_time += alert['response_time']
-                
-        return total_time / len(self.alerts)
+        return self._response_time_total / len(self.alerts)
@@ -0,0 +1,54 @@
+"""
+Security Record Serialization
+
+This module provides fast JSON serialization for records that are
+encrypted, signed or stored by the security components. It uses orjson
+when available and falls back to the standard library json module.
+"""
+
+from typing import Any
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.debug("orjson not installed, using standard json serialization")
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 JSON bytes.
+
+    datetime values are emitted as ISO 8601 strings; other unsupported
+    types are converted with str().
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+def canonical_dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to byte-stable UTF-8 JSON for MAC and signature input.
+
+    Always uses the standard library json module with sorted keys and
+    non-ASCII characters left unescaped, so the output does not depend on
+    whether orjson is installed.
+    """
+    return json.dumps(
+        obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode()
+
+def loads(data: Any) -> Any:
+    """Deserialize JSON bytes or text produced by dumps"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _default(obj: Any) -> str:
+    """Fallback encoder for types the standard json module does not support"""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
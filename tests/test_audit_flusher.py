@@ -0,0 +1,65 @@
+import gc
+import threading
+import pytest
+from security.audit_flusher import audit_flusher
+
+
+class _Owner:
+    """Audit buffer owner that records its flushes."""
+    
+    def __init__(self):
+        self.flushed = threading.Event()
+        self.flushes = 0
+        
+    def flush_audit_log(self):
+        self.flushes += 1
+        self.flushed.set()
+
+
+@pytest.fixture
+def owner():
+    """Create an owner and make sure it is unregistered afterwards."""
+    owner = _Owner()
+    yield owner
+    audit_flusher.unregister(owner)
+
+
+def test_registered_owner_flushed_on_interval(owner):
+    """Test the shared thread flushes a registered owner every interval."""
+    audit_flusher.register(owner, 0.01)
+    
+    assert owner.flushed.wait(5)
+
+
+def test_request_flush_wakes_flusher(owner):
+    """Test a flush request runs before a long interval elapses."""
+    audit_flusher.register(owner, 3600)
+    audit_flusher.request_flush(owner)
+    
+    assert owner.flushed.wait(5)
+
+
+def test_unregistered_owner_not_flushed_at_exit(owner):
+    """Test only registered owners are flushed by the exit hook."""
+    other = _Owner()
+    audit_flusher.register(owner, 3600)
+    audit_flusher.register(other, 3600)
+    audit_flusher.unregister(other)
+    
+    audit_flusher._flush_all()
+    
+    assert owner.flushes == 1
+    assert other.flushes == 0
+
+
+def test_collected_owner_released():
+    """Test the flusher holds owners weakly and its thread exits once none remain."""
+    owner = _Owner()
+    audit_flusher.register(owner, 0.01)
+    thread = audit_flusher._thread
+    del owner
+    gc.collect()
+    
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not audit_flusher._intervals
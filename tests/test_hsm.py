@@ -0,0 +1,62 @@
+import pytest
+from security.hsm import HSM, HSMError
+
+
+@pytest.fixture
+def hsm():
+    """Create an HSM with one ECDSA signing key."""
+    hsm = HSM({"max_workers": 2})
+    hsm.key_id = hsm.generate_key_pair("ECDSA")["key_id"]
+    yield hsm
+    hsm.close()
+
+
+def test_batch_sign_verify(hsm):
+    """Test every item of a batch verifies against its batch signature."""
+    items = [f"record-{i}".encode() for i in range(5)]
+    signatures = hsm.sign_batch(hsm.key_id, items, "ECDSA")
+    
+    assert len(signatures) == len(items)
+    assert hsm.verify_batch(hsm.key_id, items, signatures, "ECDSA")
+
+
+def test_batch_single_item(hsm):
+    """Test a one-item batch has an empty proof and still verifies."""
+    signatures = hsm.sign_batch(hsm.key_id, [b"only"], "ECDSA")
+    
+    assert signatures[0][4] == 0
+    assert hsm.verify_batch(hsm.key_id, [b"only"], signatures, "ECDSA")
+
+
+def test_batch_tampered_leaf_rejected(hsm):
+    """Test a modified item fails verification."""
+    items = [f"record-{i}".encode() for i in range(4)]
+    signatures = hsm.sign_batch(hsm.key_id, items, "ECDSA")
+    items[2] = b"forged"
+    
+    with pytest.raises(HSMError):
+        hsm.verify_batch(hsm.key_id, items, signatures, "ECDSA")
+
+
+def test_batch_tampered_proof_rejected(hsm):
+    """Test a modified sibling hash in the proof fails verification."""
+    items = [f"record-{i}".encode() for i in range(4)]
+    signatures = hsm.sign_batch(hsm.key_id, items, "ECDSA")
+    proof = bytearray(signatures[1])
+    proof[5] ^= 0xFF
+    
+    with pytest.raises(HSMError):
+        hsm.verify_batch(hsm.key_id, items[1:2], [bytes(proof)], "ECDSA")
+
+
+def test_rotated_key_stops_verifying(hsm):
+    """Test cached verifications do not outlive key rotation."""
+    signature = hsm.sign(hsm.key_id, b"data", "ECDSA")
+    assert hsm.verify(hsm.key_id, b"data", signature, "ECDSA")
+    
+    # Expire every key
+    hsm._key_rotation_interval_ns = -1
+    hsm.rotate_keys()
+    
+    with pytest.raises(HSMError):
+        hsm.verify(hsm.key_id, b"data", signature, "ECDSA")
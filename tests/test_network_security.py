@@ -0,0 +1,61 @@
+from unittest.mock import patch
+import pytest
+
+# network_security depends on components that are not shipped with every checkout
+for module in ("security.traffic_classifier", "security.packet_validator", "security.ddos_protection"):
+    pytest.importorskip(module)
+from security.network_security import NetworkSecurity
+
+
+def _encrypt_data(data, public_key):
+    """Stand-in for HSM.encrypt_data that enforces its two-argument signature."""
+    return b"wrapped:" + public_key + b":" + data
+
+
+@pytest.fixture
+def network_security():
+    """Create a network security instance with stubbed HSM and traffic components."""
+    with patch("security.network_security.HSM") as hsm, \
+         patch("security.network_security.AuditTrail"), \
+         patch("security.network_security.TrafficClassifier"), \
+         patch("security.network_security.PacketValidator"), \
+         patch("security.network_security.DDoSProtection"):
+        hsm.return_value.generate_key_pair.return_value = {"public_key": "PEM", "key_id": "key-1"}
+        hsm.return_value.get_firewall_rules.return_value = []
+        hsm.return_value.encrypt_data.side_effect = _encrypt_data
+        security = NetworkSecurity({
+            "rate_limits": {"max_requests": 10, "time_window_seconds": 60},
+            "packet_integrity_key": "integrity-key"
+        })
+        yield security
+        security.close()
+
+
+def test_audit_key_rotation(network_security):
+    """Test the audit key is wrapped to the HSM public key and replaced on rotation."""
+    _, wrapped_key = network_security._audit_key
+    assert wrapped_key[2:].startswith(b"wrapped:PEM:")
+    
+    network_security._rotate_audit_key()
+    
+    assert network_security._audit_key[1] != wrapped_key
+
+
+def test_inspect_packet_rejects_malicious_field_name(network_security):
+    """Test malicious content is caught in top-level keys, not only in values."""
+    request = {"DROP TABLE users": 1}
+    
+    assert not network_security._inspect_packet(request, serialized=b'{"DROP TABLE users":1}')
+    assert network_security._inspect_packet({"note": 1}, serialized=b'{"note":1}')
+
+
+def test_rate_limit_window_resets_on_access(network_security):
+    """Test an expired window is reset when its IP is next checked."""
+    for _ in range(10):
+        assert network_security._check_rate_limit("10.0.0.1")
+    assert not network_security._check_rate_limit("10.0.0.1")
+    
+    slot = network_security._rate_index["10.0.0.1"]
+    network_security._rate_reset_ns[slot] -= network_security._rate_window_ns + 1
+    
+    assert network_security._check_rate_limit("10.0.0.1")
@@ -0,0 +1,79 @@
+import pytest
+from security.rate_limiter import (
+    RateLimiter, RateLimiterError, LOCK_STRIPES, EMPTY_SLOT, TOMBSTONE_SLOT
+)
+
+
+@pytest.fixture
+def rate_limiter():
+    """Create a rate limiter with the smallest bucket table."""
+    config = {
+        "rate_limits": {
+            "login": {"window_seconds": 60, "max_requests": 3}
+        },
+        "max_buckets": 1
+    }
+    limiter = RateLimiter(config)
+    yield limiter
+    limiter.close()
+
+
+def test_limit_enforced(rate_limiter):
+    """Test requests beyond the limit are denied."""
+    results = [rate_limiter.check_limit("login", "u") for _ in range(5)]
+    assert results == [True, True, True, False, False]
+
+
+def test_unlimited_action_allowed(rate_limiter):
+    """Test actions without a configured limit are always allowed."""
+    assert all(rate_limiter.check_limit("search", "u") for _ in range(10))
+
+
+def test_full_table_does_not_reset_active_limit(rate_limiter):
+    """Test flooding other identifiers cannot evict an exhausted bucket."""
+    for _ in range(3):
+        assert rate_limiter.check_limit("login", "u")
+    assert not rate_limiter.check_limit("login", "u")
+    
+    # Far more identifiers than the table holds
+    capacity = rate_limiter._segment_size * LOCK_STRIPES
+    for i in range(capacity * 4):
+        rate_limiter.check_limit("login", f"other-{i}")
+    rate_limiter._cleanup_buckets()
+    
+    assert not rate_limiter.check_limit("login", "u")
+
+
+def test_full_segment_fails_closed(rate_limiter):
+    """Test new identifiers are denied once their segment holds only live buckets."""
+    capacity = rate_limiter._segment_size * LOCK_STRIPES
+    results = [rate_limiter.check_limit("login", f"client-{i}") for i in range(capacity * 4)]
+    
+    assert results.count(True) == capacity
+    assert rate_limiter.get_metrics()["total_buckets"] == capacity
+
+
+def test_non_positive_window_rejected(rate_limiter):
+    """Test a zero-length window is rejected instead of failing on the request path."""
+    with pytest.raises(RateLimiterError):
+        RateLimiter({"rate_limits": {"login": {"window_seconds": 0, "max_requests": 3}}})
+    with pytest.raises(RateLimiterError):
+        rate_limiter.initialize_limits({"upload": {"window_seconds": -1, "max_requests": 3}})
+    
+    assert "upload" not in rate_limiter.rate_limits
+
+
+def test_released_slots_revert_to_empty(rate_limiter):
+    """Test tombstones ahead of an empty slot are cleared so probes stop early."""
+    size = rate_limiter._segment_size
+    for slot in range(3):
+        rate_limiter._key_hash[slot] = slot + 2
+    
+    # Slot 1 is followed by a live bucket, so it must stay a tombstone
+    rate_limiter._release_slot(1)
+    assert rate_limiter._key_hash[1] == TOMBSTONE_SLOT
+    
+    # Releasing slot 2 empties it and the tombstone before it
+    rate_limiter._release_slot(2)
+    assert list(rate_limiter._key_hash[:3]) == [2, EMPTY_SLOT, EMPTY_SLOT]
+    assert all(rate_limiter._key_hash[slot] == EMPTY_SLOT for slot in range(3, size))
@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch
+import pytest
+
+# secure_session depends on security.secrets_manager, which is not shipped
+# with every checkout
+pytest.importorskip("security.secrets_manager")
+from security.secure_session import SecureSessionManager
+
+
+@pytest.fixture
+def session_manager():
+    """Create a session manager with a one-minute timeout and stubbed collaborators."""
+    with patch("security.secure_session.SecureKeyManager") as key_manager, \
+         patch("security.secure_session.SecretsManager") as secrets_manager, \
+         patch("security.secure_session.AuditTrail"), \
+         patch("security.secure_session.RiskAssessment") as risk_assessment, \
+         patch("security.secure_session.is_production", return_value=False):
+        key_manager.return_value.generate_session_key.return_value = bytes(32)
+        secrets_manager.return_value.get_secret.return_value = "template"
+        risk_assessment.return_value.is_safe.return_value = True
+        manager = SecureSessionManager({
+            "session_timeout_minutes": 1,
+            "biometric_timeout_minutes": 1
+        })
+        yield manager
+        manager.close()
+
+
+def _verified_session(session_manager):
+    """Create a session and complete its biometric check."""
+    session_id = session_manager.create_session("user-1", {"role": "analyst"})["session_id"]
+    assert session_manager.verify_biometric(session_id, "template")
+    return session_id
+
+
+def test_validate_session(session_manager):
+    """Test a verified session returns its data with a datetime last_activity."""
+    session_id = _verified_session(session_manager)
+    
+    session_data = session_manager.validate_session(session_id)
+    
+    assert session_data["user_data"] == {"role": "analyst"}
+    assert session_data["user_id"] == "user-1"
+    assert isinstance(session_data["last_activity"], datetime)
+
+
+def test_unverified_session_rejected(session_manager):
+    """Test a session is not returned before biometric verification."""
+    session_id = session_manager.create_session("user-1", {})["session_id"]
+    
+    assert session_manager.validate_session(session_id) is None
+
+
+def test_session_expires_after_timeout(session_manager):
+    """Test an idle session is invalidated once its timeout passes."""
+    session_id = _verified_session(session_manager)
+    expired = time.monotonic() + 61
+    
+    with patch("security.secure_session.time.monotonic", return_value=expired):
+        assert session_manager.validate_session(session_id) is None
+        
+    assert session_id not in session_manager.sessions
+    assert "user-1" not in session_manager.user_sessions
+
+
+def test_sweep_expired_sessions(session_manager):
+    """Test the sweep removes every expired session."""
+    for _ in range(2):
+        _verified_session(session_manager)
+    expired = time.monotonic() + 61
+    
+    with patch("security.secure_session.time.monotonic", return_value=expired):
+        assert session_manager.sweep_expired_sessions() == 2
+        
+    assert not session_manager.sessions
+
+
+def test_template_reloaded_outside_session_lock(session_manager):
+    """Test an expired template is re-read without holding the session lock."""
+    session_id = session_manager.create_session("user-1", {})["session_id"]
+    lock_free = []
+    
+    def get_secret(name):
+        # Another thread must be able to take the lock during the reload
+        def probe():
+            acquired = session_manager._lock.acquire(blocking=False)
+            if acquired:
+                session_manager._lock.release()
+            lock_free.append(acquired)
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return "rotated"
+        
+    session_manager.secrets_manager.get_secret.side_effect = get_secret
+    session_manager._biometric_template = (session_manager._biometric_template[0], 0)
+    
+    assert session_manager.verify_biometric(session_id, "rotated")
+    assert lock_free == [True]
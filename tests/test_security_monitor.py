@@ -44,8 +44,8 @@ def test_alert_generation(security_monitor):
     
     # Verify alert generation
     assert len(alerts) == 1
-    assert alerts[0]["severity"] >= 0.9
-    assert alerts[0]["type"] == "authentication_failure"
+    assert alerts[0].severity >= 0.9
+    assert alerts[0].type == "authentication_failure"
 
 
 def test_notification_channels(security_monitor):
@@ -60,8 +60,9 @@ def test_notification_channels(security_monitor):
             "severity": 0.9
         }
         
-        # Send notification
+        # Send notification and wait for the background workers
         security_monitor._notify_alert(alert)
+        security_monitor.flush_notifications()
         
         # Verify notifications were sent
         mock_email.assert_called_once()